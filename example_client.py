@@ -5,28 +5,120 @@ This script demonstrates how to connect to the server and handle messages.
 """
 
 import asyncio
-import json
+import concurrent.futures
 import signal
 import sys
+import time
 from datetime import datetime
 
 import websockets
 
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+try:
+    import uvloop
+
+    _run = uvloop.run
+except ImportError:  # uvloop is not available on Windows
+    _run = asyncio.run
+
+INPUT_PROMPT = "💬 Enter command: "
+# Flush received-message output every N messages when not on a terminal
+FLUSH_EVERY = 64
+
 
 class WebSocketClient:
     """Simple WebSocket client for demonstration."""
 
-    def __init__(self, uri: str = "ws://localhost:8000/ws"):
-        """Initialize the client with server URI."""
+    # No per-instance __dict__: smaller objects when many clients share a process
+    __slots__ = (
+        "uri",
+        "compression",
+        "websocket",
+        "running",
+        "_open",
+        "_send",
+        "_recv",
+        "_stop_event",
+        "_input_pool",
+        "_stdout_tty",
+        "_flush_counter",
+        "_iso_second",
+        "_iso_cached",
+        "_handlers",
+    )
+
+    # Static parts of the ping message; only the timestamp varies
+    _PING_PREFIX = b'{"type":"ping","timestamp":"'
+    _PING_SUFFIX = b'"}'
+
+    def __init__(
+        self,
+        uri: str = "ws://localhost:8000/ws",
+        compression: str | None = None,
+    ):
+        """
+        Initialize the client with server URI.
+
+        Per-message deflate is off by default: it saves bandwidth on large
+        JSON payloads but costs CPU on every frame. Pass
+        compression="deflate" to opt back in.
+        """
         self.uri = uri
+        self.compression = compression
         self.websocket = None
         self.running = False
+        # Tracks the connection state locally, flipped on connect/disconnect
+        self._open = False
+        # Bound send/recv of the live connection, set in connect()
+        self._send = None
+        self._recv = None
+        # Set by stop() to end run() without tearing down the loop
+        self._stop_event = asyncio.Event()
+        # Dedicated thread for blocking input(), kept off the default executor
+        self._input_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="cli-input"
+        )
+        # Terminals get immediate output, pipes/files are flushed in batches
+        self._stdout_tty = sys.stdout.isatty()
+        self._flush_counter = 0
+        # ISO timestamp cache, reformatted at most once per second
+        self._iso_second = -1
+        self._iso_cached = ""
+        # Message type -> handler, built once instead of an if/elif chain
+        self._handlers = {
+            "welcome": self._on_welcome,
+            "pong": self._on_pong,
+            "test_notification": self._on_test_notification,
+            "system": self._on_system,
+            "shutdown": self._on_shutdown,
+            "batch": self._on_batch,
+        }
 
     async def connect(self):
         """Connect to the WebSocket server."""
         try:
             print(f"🔗 Connecting to {self.uri}...")
-            self.websocket = await websockets.connect(self.uri)
+            self.websocket = await websockets.connect(
+                self.uri,
+                compression=self.compression,
+                max_size=2**22,
+                write_limit=2**20,
+            )
+            self._send = self.websocket.send
+            self._recv = self.websocket.recv
+            self._open = True
             self.running = True
             print("✅ Connected successfully!")
             return True
@@ -36,30 +128,52 @@ class WebSocketClient:
 
     async def disconnect(self):
         """Disconnect from the server."""
-        if self.websocket and not self.websocket.closed:
+        if self._open:
+            self._open = False
+            self._send = self._recv = None
             await self.websocket.close()
             print("👋 Disconnected from server")
         self.running = False
+        self._input_pool.shutdown(wait=False)
+        sys.stdout.flush()
 
     async def send_message(self, message: dict):
         """Send a message to the server."""
-        if self.websocket and not self.websocket.closed:
+        await self.send_many([message])
+
+    async def send_many(self, messages: list[dict]):
+        """Send several messages to the server in one batch."""
+        # A socket that dropped since the last check makes send() raise
+        if self._open:
+            # Serialize everything up front, then pipeline the frames
+            frames = [_dumps(message) for message in messages]
             try:
-                await self.websocket.send(json.dumps(message))
-                print(f"📤 Sent: {message}")
+                # Already UTF-8 encoded JSON, send it as text frames as-is
+                await asyncio.gather(
+                    *(self._send(frame, text=True) for frame in frames)
+                )
+                for message in messages:
+                    print(f"📤 Sent: {message}")
             except Exception as e:
                 print(f"❌ Failed to send message: {e}")
 
     async def listen_for_messages(self):
         """Listen for incoming messages from the server."""
+        recv = self._recv
+        handle_message = self.handle_message
         try:
-            async for message in self.websocket:
+            while self.running:
+                # Keep frames as raw bytes: skips the UTF-8 decode to str
+                # and lets the JSON parser work on the bytes directly
+                message = await recv(decode=False)
                 try:
-                    data = json.loads(message)
-                    await self.handle_message(data)
-                except json.JSONDecodeError:
-                    print(f"📥 Received non-JSON message: {message}")
+                    data = _loads(message)
+                except ValueError:
+                    print(f"📥 Received non-JSON message: {message.decode(errors='replace')}")
+                    continue
+                await handle_message(data)
         except websockets.exceptions.ConnectionClosed:
+            self._open = False
             print("🔌 Connection closed by server")
         except Exception as e:
             print(f"❌ Error listening for messages: {e}")
@@ -69,39 +183,75 @@ class WebSocketClient:
     async def handle_message(self, data: dict):
         """Handle incoming messages from the server."""
         message_type = data.get("type", "unknown")
-        
-        if message_type == "welcome":
-            print(f"🎉 Welcome message: {data.get('message')}")
-            print(f"   Client ID: {data.get('client_id')}")
-            print(f"   Server time: {data.get('server_time')}")
-            
-        elif message_type == "pong":
-            print(f"🏓 Pong received: {data.get('timestamp')}")
-            
-        elif message_type == "test_notification":
-            counter = data.get("data", {}).get("counter", "?")
-            message = data.get("data", {}).get("message", "No message")
-            print(f"🔔 Test notification #{counter}: {message}")
-            
-        elif message_type == "system":
-            priority = data.get("data", {}).get("priority", "normal")
-            message = data.get("data", {}).get("message", "No message")
-            print(f"⚠️  System notification [{priority}]: {message}")
-            
-        elif message_type == "shutdown":
-            print(f"🛑 Server shutdown: {data.get('message')}")
-            await self.disconnect()
-            
+        handler = self._handlers.get(message_type)
+
+        if handler:
+            await handler(data)
         else:
-            print(f"📥 Received [{message_type}]: {data}")
+            self._emit(f"📥 Received [{message_type}]: {data}")
+
+    def _emit(self, text: str):
+        """Write a handler's output with one write call, flushing in batches."""
+        sys.stdout.write(text + "\n")
+        self._flush_counter += 1
+        if self._stdout_tty or self._flush_counter >= FLUSH_EVERY:
+            sys.stdout.flush()
+            self._flush_counter = 0
+
+    async def _on_welcome(self, data: dict):
+        """Handle the welcome message sent after connecting."""
+        self._emit(
+            f"🎉 Welcome message: {data.get('message')}\n"
+            f"   Client ID: {data.get('client_id')}\n"
+            f"   Server time: {data.get('server_time')}"
+        )
+
+    async def _on_pong(self, data: dict):
+        """Handle a pong reply to our ping."""
+        self._emit(f"🏓 Pong received: {data.get('timestamp')}")
+
+    async def _on_test_notification(self, data: dict):
+        """Handle a periodic test notification."""
+        payload = data.get("data") or {}
+        counter = payload.get("counter", "?")
+        message = payload.get("message", "No message")
+        self._emit(f"🔔 Test notification #{counter}: {message}")
+
+    async def _on_system(self, data: dict):
+        """Handle a system notification."""
+        payload = data.get("data") or {}
+        priority = payload.get("priority", "normal")
+        message = payload.get("message", "No message")
+        self._emit(f"⚠️  System notification [{priority}]: {message}")
+
+    async def _on_shutdown(self, data: dict):
+        """Handle the server shutdown notice."""
+        self._emit(f"🛑 Server shutdown: {data.get('message')}")
+        await self.disconnect()
+
+    async def _on_batch(self, data: dict):
+        """Handle several messages the server coalesced into one frame."""
+        for item in data.get("items") or ():
+            await self.handle_message(item)
+
+    def _iso_now(self) -> str:
+        """Return the current time as an ISO string with 1s granularity."""
+        second = int(time.time())
+        if second != self._iso_second:
+            self._iso_second = second
+            self._iso_cached = datetime.fromtimestamp(second).isoformat()
+        return self._iso_cached
 
     async def send_ping(self):
         """Send a ping message to the server."""
-        ping_message = {
-            "type": "ping",
-            "timestamp": datetime.now().isoformat()
-        }
-        await self.send_message(ping_message)
+        if self._open:
+            # Fixed-shape message: splice the timestamp into pre-encoded JSON
+            frame = self._PING_PREFIX + self._iso_now().encode() + self._PING_SUFFIX
+            try:
+                await self._send(frame, text=True)
+                print(f"📤 Sent: {frame.decode()}")
+            except Exception as e:
+                print(f"❌ Failed to send message: {e}")
 
     async def interactive_mode(self):
         """Run in interactive mode where user can send messages."""
@@ -112,51 +262,89 @@ class WebSocketClient:
         print("  Any other text - Send as a custom message")
         print()
 
+        loop = asyncio.get_running_loop()
+        lines: asyncio.Queue = asyncio.Queue()
+        # Read stdin on the input thread, so pasted lines queue up while the
+        # previous ones are being sent
+        self._input_pool.submit(self._read_input, loop, lines)
+
         while self.running:
             try:
-                # Use asyncio to handle input without blocking
-                user_input = await asyncio.get_event_loop().run_in_executor(
-                    None, input, "💬 Enter command: "
-                )
-                
-                if user_input.lower() in ['quit', 'exit']:
+                user_inputs = [await lines.get()]
+                # Lines pasted together arrive back to back: take them all
+                while not lines.empty():
+                    user_inputs.append(lines.get_nowait())
+
+                if not await self._send_inputs(user_inputs):
                     break
-                elif user_input.lower() == 'ping':
-                    await self.send_ping()
-                elif user_input.strip():
-                    custom_message = {
-                        "type": "custom",
-                        "message": user_input,
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    await self.send_message(custom_message)
-                    
-            except (EOFError, KeyboardInterrupt):
-                break
+
             except Exception as e:
                 print(f"❌ Error in interactive mode: {e}")
 
         await self.disconnect()
 
+    def _read_input(self, loop: asyncio.AbstractEventLoop, lines: asyncio.Queue):
+        """Read stdin lines on the input thread and queue them on the loop."""
+        while self.running:
+            try:
+                line = input(INPUT_PROMPT)
+            except (EOFError, KeyboardInterrupt):
+                line = None
+            # None tells interactive_mode that input has ended
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+            if line is None:
+                return
+
+    async def _send_inputs(self, user_inputs: list) -> bool:
+        """Send a run of input lines, batching consecutive custom messages."""
+        custom_messages = []
+        keep_running = True
+        for user_input in user_inputs:
+            if user_input is None or user_input.lower() in ['quit', 'exit']:
+                keep_running = False
+                break
+            elif user_input.lower() == 'ping':
+                # Keep the ping in order with the messages typed before it
+                if custom_messages:
+                    await self.send_many(custom_messages)
+                    custom_messages = []
+                await self.send_ping()
+            elif user_input.strip():
+                custom_messages.append({
+                    "type": "custom",
+                    "message": user_input,
+                    "timestamp": self._iso_now()
+                })
+
+        if custom_messages:
+            await self.send_many(custom_messages)
+        return keep_running
+
+    def stop(self):
+        """Ask run() to stop; safe to call from a signal handler via the loop."""
+        self._stop_event.set()
+
     async def run(self, interactive: bool = False):
         """Run the client."""
         if not await self.connect():
             return
 
         try:
-            if interactive:
-                # Run interactive mode and message listener concurrently
-                await asyncio.gather(
-                    self.listen_for_messages(),
-                    self.interactive_mode()
-                )
-            else:
-                # Just listen for messages
-                print("👂 Listening for messages... (Press Ctrl+C to exit)")
-                await self.listen_for_messages()
-                
-        except KeyboardInterrupt:
-            print("\n🛑 Interrupted by user")
+            async with asyncio.TaskGroup() as tg:
+                workers = [tg.create_task(self.listen_for_messages())]
+                if interactive:
+                    # Run interactive mode and message listener concurrently
+                    workers.append(tg.create_task(self.interactive_mode()))
+                else:
+                    # Just listen for messages
+                    print("👂 Listening for messages... (Press Ctrl+C to exit)")
+
+                # Whichever worker finishes first (or Ctrl+C) stops the rest
+                for worker in workers:
+                    worker.add_done_callback(lambda _: self.stop())
+                await self._stop_event.wait()
+                for worker in workers:
+                    worker.cancel()
         finally:
             await self.disconnect()
 
@@ -180,12 +368,12 @@ async def main():
     args = parser.parse_args()
     
     client = WebSocketClient(args.uri)
-    
-    # Handle Ctrl+C gracefully
+    loop = asyncio.get_running_loop()
+
+    # Handle Ctrl+C gracefully: wake run() instead of exiting mid-flight
     def signal_handler(signum, frame):
         print("\n🛑 Received interrupt signal")
-        asyncio.create_task(client.disconnect())
-        sys.exit(0)
+        loop.call_soon_threadsafe(client.stop)
     
     signal.signal(signal.SIGINT, signal_handler)
     
@@ -194,7 +382,7 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        _run(main())
     except KeyboardInterrupt:
         print("\n👋 Goodbye!")
     except Exception as e:
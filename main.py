@@ -5,20 +5,61 @@ A production-ready WebSocket notification server built with FastAPI that provide
 real-time communication capabilities with graceful shutdown mechanisms.
 """
 
+import argparse
+import importlib.util
 import sys
 from pathlib import Path
+from typing import Any
 
 import uvicorn
 from loguru import logger
 
 # Add the project root to Python path
 project_root = Path(__file__).parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 from websocket_server.app import app
 from websocket_server.config import settings, setup_logging
 
 
+def get_event_loop_impl() -> str:
+    """
+    Select the event loop implementation for uvicorn.
+
+    Returns:
+        "uvloop" when it is installed, "asyncio" otherwise (e.g. on Windows)
+    """
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        return "asyncio"
+
+    return "uvloop"
+
+
+def get_protocol_config() -> dict[str, Any]:
+    """
+    Pin uvicorn's event loop and protocol implementations.
+
+    Prefers the C-accelerated uvloop and httptools when they are installed
+    and uses the websockets library for WebSocket connections. Per-message
+    deflate is disabled: compressing every frame costs CPU on each send,
+    which adds up quickly on broadcasts.
+
+    Returns:
+        uvicorn keyword arguments for loop, http, ws and ws_per_message_deflate
+    """
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+    return {
+        "loop": get_event_loop_impl(),
+        "http": http,
+        "ws": "websockets",
+        "ws_per_message_deflate": False,
+    }
+
+
 def main() -> None:
     """
     Main application entry point.
@@ -30,17 +71,21 @@ def main() -> None:
         # Setup logging first
         setup_logging()
 
+        # Read the settings once; they are reused in the log record and config
+        host, port, workers = settings.host, settings.port, settings.workers
+        debug, log_level = settings.debug, settings.log_level
+
         logger.info(
             "Initializing WebSocket Notification Server",
             extra={
                 "version": "0.1.0",
                 "python_version": sys.version,
                 "settings": {
-                    "host": settings.host,
-                    "port": settings.port,
-                    "workers": settings.workers,
-                    "debug": settings.debug,
-                    "log_level": settings.log_level
+                    "host": host,
+                    "port": port,
+                    "workers": workers,
+                    "debug": debug,
+                    "log_level": log_level
                 }
             }
         )
@@ -50,9 +95,10 @@ def main() -> None:
 
         # Add the FastAPI app to the config
         uvicorn_config["app"] = app
+        uvicorn_config.update(get_protocol_config())
 
         # Additional uvicorn settings for production
-        if not settings.debug:
+        if not debug:
             uvicorn_config.update({
                 "access_log": False,  # We handle our own access logging
                 "server_header": False,  # Don't expose server info
@@ -88,6 +134,7 @@ def run_development_server() -> None:
         "host": settings.host,
         "port": settings.port,
         "reload": False,  # Disabled for proper shutdown handling
+        **get_protocol_config(),
         "log_level": "debug",
         "access_log": True,
         "workers": 1,  # Always use 1 worker in development
@@ -104,18 +151,21 @@ def run_production_server() -> None:
     This function starts the server with production-optimized settings
     including multiple workers if configured.
     """
+    workers = settings.workers
+
     # Production configuration
     prod_config = settings.get_uvicorn_config()
     prod_config.update({
         "app": app,
+        **get_protocol_config(),
         "access_log": False,
         "server_header": False,
         "date_header": False,
     })
 
     logger.info(
-        f"Starting production server with {settings.workers} workers",
-        extra={"workers": settings.workers}
+        f"Starting production server with {workers} workers",
+        extra={"workers": workers}
     )
     uvicorn.run(**prod_config)
 
@@ -133,15 +183,15 @@ def check_dependencies() -> bool:
         "websockets",
         "pydantic",
         "loguru",
+        "orjson",
         "dotenv"  # python-dotenv package imports as 'dotenv'
     ]
 
     missing_modules = []
 
+    # Only ask the import finders, don't execute the modules
     for module in required_modules:
-        try:
-            __import__(module)
-        except ImportError:
+        if importlib.util.find_spec(module) is None:
             missing_modules.append(module)
 
     if missing_modules:
@@ -154,32 +204,42 @@ def check_dependencies() -> bool:
 
 def print_server_info() -> None:
     """Print server information and available endpoints."""
-    print("\n" + "="*60)
-    print("WebSocket Notification Server")
-    print("="*60)
-    print("Version: 0.1.0")
-    print(f"Host: {settings.host}")
-    print(f"Port: {settings.port}")
-    print(f"Workers: {settings.workers}")
-    print(f"Debug Mode: {settings.debug}")
-    print(f"Log Level: {settings.log_level}")
-    print("\nAvailable Endpoints:")
-    print(f"  WebSocket: ws://{settings.host}:{settings.port}/ws")
-    print(f"  Health Check: http://{settings.host}:{settings.port}/health")
-    print(f"  Notifications: http://{settings.host}:{settings.port}/notify")
-    print(f"  Metrics: http://{settings.host}:{settings.port}/metrics")
-    print(f"  Status: http://{settings.host}:{settings.port}/status")
-
-    if settings.debug:
-        print(f"  API Docs: http://{settings.host}:{settings.port}/docs")
-        print(f"  ReDoc: http://{settings.host}:{settings.port}/redoc")
-
-    print("="*60 + "\n")
+    host, port = settings.host, settings.port
+    debug = settings.debug
+    base = f"http://{host}:{port}"
+    separator = "=" * 60
+
+    lines = [
+        "",
+        separator,
+        "WebSocket Notification Server",
+        separator,
+        "Version: 0.1.0",
+        f"Host: {host}",
+        f"Port: {port}",
+        f"Workers: {settings.workers}",
+        f"Debug Mode: {debug}",
+        f"Log Level: {settings.log_level}",
+        "",
+        "Available Endpoints:",
+        f"  WebSocket: ws://{host}:{port}/ws",
+        f"  Health Check: {base}/health",
+        f"  Notifications: {base}/notify",
+        f"  Metrics: {base}/metrics",
+        f"  Status: {base}/status",
+    ]
 
+    if debug:
+        lines.append(f"  API Docs: {base}/docs")
+        lines.append(f"  ReDoc: {base}/redoc")
 
-if __name__ == "__main__":
-    import argparse
+    lines.append(separator + "\n")
 
+    # Emit the whole block with a single write
+    print("\n".join(lines))
+
+
+if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="WebSocket Notification Server",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -0,0 +1,44 @@
+"""Lightweight WebSocket stand-in for tests that fan out to many clients."""
+
+import orjson
+
+
+class FakeWS:
+    """Minimal WebSocket double recording every message it is sent."""
+
+    __slots__ = ("headers", "sent", "closed")
+
+    def __init__(self, user_agent: str = "test-client"):
+        """Initialize the fake with an empty send log."""
+        self.headers = {"user-agent": user_agent}
+        self.sent: list = []
+        self.closed = False
+
+    async def accept(self) -> None:
+        """Accept the connection (no-op)."""
+
+    async def send_json(self, message) -> None:
+        """Record a message sent as JSON."""
+        self.sent.append(message)
+
+    async def send_text(self, text: str) -> None:
+        """Record a pre-serialized JSON text frame."""
+        self.sent.append(orjson.loads(text))
+
+    async def send_bytes(self, data: bytes) -> None:
+        """Record a pre-serialized JSON binary frame."""
+        self.sent.append(orjson.loads(data))
+
+    def received(self) -> list:
+        """Return the messages sent, with coalesced batch frames unpacked in order."""
+        messages = []
+        for message in self.sent:
+            if message.get("type") == "batch":
+                messages.extend(message["items"])
+            else:
+                messages.append(message)
+        return messages
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        """Mark the connection as closed."""
+        self.closed = True
@@ -0,0 +1,64 @@
+"""Shared pytest fixtures for the WebSocket Notification Server tests."""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
+
+from websocket_server.app import app
+from websocket_server.services.connection_manager import ConnectionManager
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run async tests on uvloop where available, like the server does."""
+    try:
+        import uvloop
+    except ImportError:  # uvloop is not available on Windows
+        return {"asyncio": asyncio.new_event_loop}
+
+    return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(scope="session")
+def http_client():
+    """
+    Create one TestClient for the whole session.
+
+    The app lifespan is not entered: it registers signal handlers, which
+    only works on the main thread, while TestClient runs the app in a
+    portal thread.
+    """
+    client = TestClient(app)
+    yield client
+    client.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def async_client() -> AsyncIterator[AsyncClient]:
+    """
+    Create one async HTTP client for the whole session.
+
+    Requests run on the test's own event loop, without TestClient's portal
+    thread. Like http_client, the app lifespan is not entered.
+    """
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest_asyncio.fixture
+async def fresh_manager():
+    """Create a ConnectionManager and disconnect any clients a test leaves behind."""
+    manager = ConnectionManager()
+    yield manager
+
+    writers = list(manager._writers.values())
+    for client_id in await manager.get_all_connection_info():
+        await manager.disconnect(client_id)
+    # Disconnecting cancels the writer tasks; let them finish within the test
+    await asyncio.gather(*writers, return_exceptions=True)
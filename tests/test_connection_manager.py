@@ -1,17 +1,25 @@
 """Unit tests for ConnectionManager."""
 
-from unittest.mock import AsyncMock
+import asyncio
+from unittest.mock import AsyncMock, patch
 
+import orjson
 import pytest
 from fastapi import WebSocket
 
-from websocket_server.services.connection_manager import ConnectionManager
+from tests._fakews import FakeWS
+from websocket_server.handlers import ErrorHandler, WebSocketError
+from websocket_server.serialization import ZLIB_FRAME_MARKER, decompress, dumps
+from websocket_server.services.connection_manager import (
+    BROADCAST_BATCH_SIZE,
+    SEND_QUEUE_SIZE,
+)
 
 
 @pytest.fixture
-def connection_manager():
-    """Create a ConnectionManager instance for testing."""
-    return ConnectionManager()
+def connection_manager(fresh_manager):
+    """Create a ConnectionManager that disconnects its clients after the test."""
+    return fresh_manager
 
 
 @pytest.fixture
@@ -21,14 +29,24 @@ def mock_websocket():
     websocket.headers = {"user-agent": "test-client"}
     websocket.accept = AsyncMock()
     websocket.send_json = AsyncMock()
+    websocket.send_text = AsyncMock()
+    websocket.send_bytes = AsyncMock()
     websocket.close = AsyncMock()
     return websocket
 
 
+def sent_frame(websocket) -> bytes:
+    """Return the serialized payload a mock WebSocket was sent last."""
+    if websocket.send_bytes.called:
+        return websocket.send_bytes.call_args.args[0]
+    if websocket.send_text.called:
+        return websocket.send_text.call_args.args[0].encode()
+    return orjson.dumps(websocket.send_json.call_args.args[0])
+
+
 class TestConnectionManager:
     """Test cases for ConnectionManager."""
 
-    @pytest.mark.asyncio
     async def test_connect_new_client(self, connection_manager, mock_websocket):
         """Test connecting a new client."""
         client_id = "test_client_1"
@@ -47,7 +65,6 @@ class TestConnectionManager:
         assert info.client_id == client_id
         assert info.user_agent == "test-client"
 
-    @pytest.mark.asyncio
     async def test_connect_duplicate_client(self, connection_manager, mock_websocket):
         """Test connecting a client that's already connected."""
         client_id = "test_client_1"
@@ -59,7 +76,6 @@ class TestConnectionManager:
         with pytest.raises(ValueError, match="already connected"):
             await connection_manager.connect(mock_websocket, client_id)
 
-    @pytest.mark.asyncio
     async def test_disconnect_client(self, connection_manager, mock_websocket):
         """Test disconnecting a client."""
         client_id = "test_client_1"
@@ -76,53 +92,87 @@ class TestConnectionManager:
         info = await connection_manager.get_connection_info(client_id)
         assert info is None
 
-    @pytest.mark.asyncio
+    async def test_wait_for_no_connections(self, connection_manager, mock_websocket):
+        """Test waiting for the last client to disconnect."""
+        # Nothing connected yet: returns immediately
+        await asyncio.wait_for(connection_manager.wait_for_no_connections(), timeout=1.0)
+
+        await connection_manager.connect(mock_websocket, "test_client_1")
+        waiter = asyncio.create_task(connection_manager.wait_for_no_connections())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await connection_manager.disconnect("test_client_1")
+        await asyncio.wait_for(waiter, timeout=1.0)
+
     async def test_disconnect_unknown_client(self, connection_manager):
         """Test disconnecting a client that doesn't exist."""
         # Should not raise an error
         await connection_manager.disconnect("unknown_client")
         assert await connection_manager.get_connection_count() == 0
 
-    @pytest.mark.asyncio
     async def test_broadcast_to_multiple_clients(self, connection_manager):
         """Test broadcasting a message to multiple clients."""
-        # Create multiple mock WebSockets
+        # Create multiple fake WebSockets
         websockets = []
-        client_ids = []
 
+        for i in range(3):
+            ws = FakeWS(f"test-client-{i}")
+            websockets.append(ws)
+            await connection_manager.connect(ws, f"test_client_{i}")
+
+        # Broadcast message
+        message = {"type": "test", "data": "hello"}
+        recipients = await connection_manager.broadcast(message)
+        await connection_manager.flush()
+
+        # Verify all clients received the message
+        assert recipients == 3
+        for ws in websockets:
+            assert ws.sent == [message]
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            {"type": "test", "data": "hello"},
+            {"type": "test", "data": {"counter": 1, "nested": [1.5, None, True]}},
+            {"type": "test", "data": "héllo wörld ✓"},
+        ],
+    )
+    async def test_broadcast_serialized_payload(self, connection_manager, message):
+        """Test every client receives the same serialized payload."""
+        websockets = []
         for i in range(3):
             ws = AsyncMock(spec=WebSocket)
             ws.headers = {"user-agent": f"test-client-{i}"}
             ws.accept = AsyncMock()
             ws.send_json = AsyncMock()
+            ws.send_text = AsyncMock()
+            ws.send_bytes = AsyncMock()
             websockets.append(ws)
+            await connection_manager.connect(ws, f"test_client_{i}")
 
-            client_id = f"test_client_{i}"
-            client_ids.append(client_id)
-            await connection_manager.connect(ws, client_id)
-
-        # Broadcast message
-        message = {"type": "test", "data": "hello"}
         recipients = await connection_manager.broadcast(message)
+        await connection_manager.flush()
 
-        # Verify all clients received the message
         assert recipients == 3
+        expected = orjson.dumps(message)
         for ws in websockets:
-            ws.send_json.assert_called_once_with(message)
+            assert sent_frame(ws) == expected
+            assert orjson.loads(sent_frame(ws)) == message
 
-    @pytest.mark.asyncio
     async def test_broadcast_with_failed_client(self, connection_manager):
         """Test broadcasting when one client fails to receive."""
         # Create two mock WebSockets
         ws1 = AsyncMock(spec=WebSocket)
         ws1.headers = {"user-agent": "test-client-1"}
         ws1.accept = AsyncMock()
-        ws1.send_json = AsyncMock()
+        ws1.send_text = AsyncMock()
 
         ws2 = AsyncMock(spec=WebSocket)
         ws2.headers = {"user-agent": "test-client-2"}
         ws2.accept = AsyncMock()
-        ws2.send_json = AsyncMock(side_effect=Exception("Connection failed"))
+        ws2.send_text = AsyncMock(side_effect=Exception("Connection failed"))
         ws2.close = AsyncMock()
 
         # Connect both clients
@@ -132,15 +182,15 @@ class TestConnectionManager:
         # Broadcast message
         message = {"type": "test", "data": "hello"}
         recipients = await connection_manager.broadcast(message)
+        await connection_manager.flush()
 
-        # Only one client should have received the message
-        assert recipients == 1
-        ws1.send_json.assert_called_once_with(message)
+        # Both sends were queued, but only one client received the message
+        assert recipients == 2
+        assert orjson.loads(sent_frame(ws1)) == message
 
         # Failed client should be cleaned up
         assert await connection_manager.get_connection_count() == 1
 
-    @pytest.mark.asyncio
     async def test_broadcast_to_no_clients(self, connection_manager):
         """Test broadcasting when no clients are connected."""
         message = {"type": "test", "data": "hello"}
@@ -148,7 +198,6 @@ class TestConnectionManager:
 
         assert recipients == 0
 
-    @pytest.mark.asyncio
     async def test_get_all_connection_info(self, connection_manager, mock_websocket):
         """Test getting all connection information."""
         # Connect multiple clients
@@ -167,57 +216,46 @@ class TestConnectionManager:
             assert client_id in all_info
             assert all_info[client_id].client_id == client_id
 
-    @pytest.mark.asyncio
     async def test_ping_all_connections(self, connection_manager):
         """Test pinging all connected clients."""
         # Connect multiple clients
         websockets = []
         for i in range(2):
-            ws = AsyncMock(spec=WebSocket)
-            ws.headers = {"user-agent": f"test-client-{i}"}
-            ws.accept = AsyncMock()
-            ws.send_json = AsyncMock()
+            ws = FakeWS(f"test-client-{i}")
             websockets.append(ws)
             await connection_manager.connect(ws, f"client_{i}")
 
         # Ping all connections
         recipients = await connection_manager.ping_all_connections()
+        await connection_manager.flush()
 
         assert recipients == 2
         for ws in websockets:
-            ws.send_json.assert_called_once()
+            assert len(ws.sent) == 1
             # Verify ping message format
-            call_args = ws.send_json.call_args[0][0]
-            assert call_args["type"] == "ping"
-            assert "timestamp" in call_args
+            assert ws.sent[0]["type"] == "ping"
+            assert "timestamp" in ws.sent[0]
 
-    @pytest.mark.asyncio
     async def test_shutdown_all_connections(self, connection_manager):
         """Test shutting down all connections."""
         # Connect multiple clients
         websockets = []
         for i in range(2):
-            ws = AsyncMock(spec=WebSocket)
-            ws.headers = {"user-agent": f"test-client-{i}"}
-            ws.accept = AsyncMock()
-            ws.send_json = AsyncMock()
-            ws.close = AsyncMock()
+            ws = FakeWS(f"test-client-{i}")
             websockets.append(ws)
             await connection_manager.connect(ws, f"client_{i}")
 
         # Shutdown all connections
         await connection_manager.shutdown_all_connections()
 
-        # Verify shutdown message was sent to all clients
+        # Verify shutdown message was sent to all clients and sockets closed
         for ws in websockets:
-            ws.send_json.assert_called()
-            call_args = ws.send_json.call_args[0][0]
-            assert call_args["type"] == "shutdown"
+            assert ws.sent[-1]["type"] == "shutdown"
+            assert ws.closed
 
         # Verify all connections were closed
         assert await connection_manager.get_connection_count() == 0
 
-    @pytest.mark.asyncio
     async def test_cleanup_stale_connections(self, connection_manager):
         """Test cleanup of stale connections."""
         # This test would require mocking datetime to simulate stale connections
@@ -225,7 +263,6 @@ class TestConnectionManager:
         stale_count = await connection_manager.cleanup_stale_connections()
         assert stale_count == 0
 
-    @pytest.mark.asyncio
     async def test_get_total_connections(self, connection_manager, mock_websocket):
         """Test getting total connection count."""
         initial_total = await connection_manager.get_total_connections()
@@ -237,3 +274,169 @@ class TestConnectionManager:
         # Total should have increased
         final_total = await connection_manager.get_total_connections()
         assert final_total == initial_total + 1
+
+    async def test_broadcast_encodes_once(self, connection_manager):
+        """Test a broadcast encodes the message once and sends the same frame to every client."""
+        websockets = [FakeWS(f"test-client-{i}") for i in range(3)]
+        for i, ws in enumerate(websockets):
+            await connection_manager.connect(ws, f"test_client_{i}")
+
+        message = {"type": "test", "data": "hello"}
+        with patch(
+            "websocket_server.services.connection_manager.dumps", wraps=orjson.dumps
+        ) as mock_dumps:
+            recipients = await connection_manager.broadcast(message)
+        await connection_manager.flush()
+
+        assert recipients == 3
+        mock_dumps.assert_called_once_with(message)
+        for ws in websockets:
+            assert ws.sent == [message]
+
+    async def test_broadcast_encoded(self, connection_manager, mock_websocket):
+        """Test broadcasting a payload that is already serialized."""
+        await connection_manager.connect(mock_websocket, "test_client_1")
+
+        recipients = await connection_manager.broadcast_encoded(b'{"type":"test"}', "test")
+        await connection_manager.flush()
+
+        assert recipients == 1
+        mock_websocket.send_text.assert_called_once_with('{"type":"test"}')
+
+    async def test_broadcast_yields_between_batches(self, connection_manager):
+        """Test a large broadcast lets other tasks run before it finishes."""
+        websockets = [FakeWS(f"test-client-{i}") for i in range(BROADCAST_BATCH_SIZE * 2)]
+        for i, ws in enumerate(websockets):
+            await connection_manager.connect(ws, f"test_client_{i}")
+
+        # Record how much the last client had been sent when this task ran
+        last_sent_when_run = []
+
+        async def bystander_task():
+            last_sent_when_run.append(len(websockets[-1].sent))
+
+        bystander = asyncio.create_task(bystander_task())
+
+        recipients = await connection_manager.broadcast({"type": "test"})
+        await bystander
+
+        assert recipients == len(websockets)
+        assert last_sent_when_run == [0]
+
+    async def test_broadcast_drops_client_with_full_queue(self, connection_manager, mock_websocket):
+        """Test a client that stops draining its send queue is disconnected."""
+        # The writer blocks on the first frame, so later frames pile up
+        unblock = asyncio.Event()
+
+        async def stalled_send(text):
+            await unblock.wait()
+
+        mock_websocket.send_text = AsyncMock(side_effect=stalled_send)
+        await connection_manager.connect(mock_websocket, "slow_client")
+
+        for i in range(SEND_QUEUE_SIZE + 1):
+            assert await connection_manager.broadcast({"type": "test", "n": i}) == 1
+
+        # One frame in flight plus a full queue: the next one overflows
+        assert await connection_manager.broadcast({"type": "test"}) == 0
+        assert await connection_manager.get_connection_count() == 0
+        mock_websocket.close.assert_called_once()
+        unblock.set()
+
+    async def test_queued_frames_coalesced_into_batch(self, connection_manager):
+        """Test frames queued behind a slow send go out as one batch frame."""
+        first_send = asyncio.Event()
+        unblock = asyncio.Event()
+
+        class StalledWS(FakeWS):
+            __slots__ = ()
+
+            async def send_text(self, text: str) -> None:
+                first_send.set()
+                await unblock.wait()
+                await super().send_text(text)
+
+        ws = StalledWS()
+        await connection_manager.connect(ws, "batch_client")
+
+        await connection_manager.broadcast({"type": "test", "n": 0})
+        await first_send.wait()
+        # These queue up while the first frame is still being written
+        for n in range(1, 4):
+            await connection_manager.broadcast({"type": "test", "n": n})
+
+        unblock.set()
+        await connection_manager.flush()
+
+        assert ws.sent[0] == {"type": "test", "n": 0}
+        assert ws.sent[1] == {
+            "type": "batch",
+            "items": [{"type": "test", "n": n} for n in range(1, 4)],
+        }
+
+    async def test_broadcast_compresses_once_for_zlib_clients(self, connection_manager):
+        """Test zlib clients get one shared compressed frame, others get text."""
+        plain, zlib_1, zlib_2 = (
+            AsyncMock(spec=WebSocket, headers={}) for _ in range(3)
+        )
+        await connection_manager.connect(plain, "plain_client")
+        await connection_manager.connect(zlib_1, "zlib_client_1", compress=True)
+        await connection_manager.connect(zlib_2, "zlib_client_2", compress=True)
+
+        message = {"type": "test", "message": "compressed " * 20}
+        assert await connection_manager.broadcast(message) == 3
+        await connection_manager.flush()
+
+        plain.send_text.assert_called_once_with(dumps(message).decode())
+        plain.send_bytes.assert_not_called()
+        frame = zlib_1.send_bytes.call_args.args[0]
+        assert frame is zlib_2.send_bytes.call_args.args[0]
+        assert frame[:1] == ZLIB_FRAME_MARKER
+        assert len(frame) < len(dumps(message))
+        assert decompress(frame) == dumps(message)
+
+    async def test_send_to_single_client_in_order_with_broadcasts(self, connection_manager):
+        """Test send() goes through the client's queue, after earlier broadcasts."""
+        ws_1, ws_2 = FakeWS(), FakeWS()
+        await connection_manager.connect(ws_1, "client_1")
+        await connection_manager.connect(ws_2, "client_2")
+
+        await connection_manager.broadcast({"type": "test", "n": 0})
+        assert await connection_manager.send("client_1", {"type": "reply"})
+        await connection_manager.flush()
+
+        assert ws_1.received() == [{"type": "test", "n": 0}, {"type": "reply"}]
+        assert ws_2.received() == [{"type": "test", "n": 0}]
+
+    async def test_send_to_unknown_client(self, connection_manager):
+        """Test sending to a client that is not connected reports failure."""
+        assert not await connection_manager.send("missing_client", {"type": "reply"})
+
+    async def test_flush_single_client_reports_failed_write(
+        self, connection_manager, mock_websocket
+    ):
+        """Test flush(client_id) returns after a failed write has dropped the client."""
+        mock_websocket.send_text = AsyncMock(side_effect=ConnectionError("gone"))
+        await connection_manager.connect(mock_websocket, "dead_client")
+
+        assert await connection_manager.send("dead_client", {"type": "ping"})
+        await connection_manager.flush("dead_client")
+
+        assert await connection_manager.get_connection_info("dead_client") is None
+        mock_websocket.close.assert_called_once()
+
+    async def test_websocket_error_goes_through_send_queue(self, connection_manager):
+        """Test ErrorHandler queues the error for a registered client before closing."""
+        ws = FakeWS()
+        await connection_manager.connect(ws, "error_client")
+        await connection_manager.broadcast({"type": "test"})
+
+        await ErrorHandler.handle_websocket_error(
+            ws, WebSocketError("boom"), "error_client", connection_manager
+        )
+
+        received = ws.received()
+        assert received[0] == {"type": "test"}
+        assert received[1]["type"] == "error"
+        assert received[1]["message"] == "boom"
+        assert ws.closed
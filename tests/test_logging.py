@@ -0,0 +1,52 @@
+"""Unit tests for the loguru logging configuration."""
+
+import os
+import time
+from unittest.mock import patch
+
+from loguru import logger
+
+from websocket_server.config.logging import LoguruConfig
+from websocket_server.config.settings import settings
+
+
+def _touch(path, age_days=0):
+    """Create an empty file whose mtime is age_days in the past."""
+    path.write_bytes(b"")
+    mtime = time.time() - age_days * 86400
+    os.utime(path, (mtime, mtime))
+
+
+def test_retention_prunes_logs_of_stale_worker_pids(tmp_path):
+    """Test that retention removes expired files left by earlier worker pids."""
+    config = LoguruConfig()
+    config.log_dir = tmp_path
+
+    stale_active = tmp_path / "websocket_server.999.log"
+    stale_archive = tmp_path / "websocket_server.999.2026-01-01_00-00-00_000000.log.gz"
+    recent_archive = tmp_path / "websocket_server.998.2026-01-02_00-00-00_000000.log.gz"
+    other_sink = tmp_path / "errors.999.log.gz"
+    _touch(stale_active, age_days=10)
+    _touch(stale_archive, age_days=10)
+    _touch(recent_archive)
+    _touch(other_sink, age_days=10)
+
+    with patch.object(settings, "workers", 2), patch.object(settings, "log_retention", "1 day"):
+        # Without rotation, loguru applies retention when the sink is removed
+        handler_id = logger.add(
+            config._log_file("websocket_server"),
+            retention=config._retention("websocket_server"),
+        )
+        logger.remove(handler_id)
+
+    assert not stale_active.exists()
+    assert not stale_archive.exists()
+    assert recent_archive.exists()
+    assert other_sink.exists()
+    assert (tmp_path / f"websocket_server.{os.getpid()}.log").exists()
+
+
+def test_retention_single_worker_uses_setting():
+    """Test that a single worker passes the retention setting to loguru as is."""
+    with patch.object(settings, "workers", 1):
+        assert LoguruConfig()._retention("errors") == settings.log_retention
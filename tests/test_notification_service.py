@@ -5,18 +5,32 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
-from websocket_server.services.connection_manager import ConnectionManager
 from websocket_server.services.notification_service import NotificationService
 
 
+class FakeConnectionManager:
+    """
+    Minimal stand-in for ConnectionManager.
+
+    NotificationService only uses broadcast() and the two counters, so a
+    plain class is far cheaper to build than AsyncMock(spec=ConnectionManager).
+    broadcast stays an AsyncMock so tests can assert on its calls.
+    """
+
+    def __init__(self):
+        self.broadcast = AsyncMock(return_value=5)  # Default 5 recipients
+
+    async def get_connection_count(self) -> int:
+        return 5
+
+    async def get_total_connections(self) -> int:
+        return 100
+
+
 @pytest.fixture
 def mock_connection_manager():
-    """Create a mock ConnectionManager for testing."""
-    manager = AsyncMock(spec=ConnectionManager)
-    manager.broadcast = AsyncMock(return_value=5)  # Default 5 recipients
-    manager.get_connection_count = AsyncMock(return_value=5)
-    manager.get_total_connections = AsyncMock(return_value=100)
-    return manager
+    """Create a fake ConnectionManager for testing."""
+    return FakeConnectionManager()
 
 
 @pytest.fixture
@@ -28,21 +42,19 @@ def notification_service(mock_connection_manager):
 class TestNotificationService:
     """Test cases for NotificationService."""
 
-    @pytest.mark.asyncio
     async def test_start_periodic_notifications(self, notification_service):
         """Test starting periodic notifications."""
-        assert not notification_service._is_running
+        assert not notification_service.is_running()
 
         # Start periodic notifications
         await notification_service.start_periodic_notifications()
 
-        assert notification_service._is_running
+        assert notification_service.is_running()
         assert notification_service._periodic_task is not None
 
         # Clean up
         await notification_service.stop_periodic_notifications()
 
-    @pytest.mark.asyncio
     async def test_start_periodic_notifications_already_running(self, notification_service):
         """Test starting periodic notifications when already running."""
         # Start first time
@@ -58,7 +70,6 @@ class TestNotificationService:
         # Clean up
         await notification_service.stop_periodic_notifications()
 
-    @pytest.mark.asyncio
     async def test_stop_periodic_notifications(self, notification_service):
         """Test stopping periodic notifications."""
         # Start notifications
@@ -67,16 +78,14 @@ class TestNotificationService:
 
         # Stop notifications
         await notification_service.stop_periodic_notifications()
-        assert not notification_service._is_running
+        assert not notification_service.is_running()
 
-    @pytest.mark.asyncio
     async def test_stop_periodic_notifications_not_running(self, notification_service):
         """Test stopping periodic notifications when not running."""
         # Should not raise an error
         await notification_service.stop_periodic_notifications()
         assert not notification_service._is_running
 
-    @pytest.mark.asyncio
     async def test_send_notification_dict(self, notification_service, mock_connection_manager):
         """Test sending a notification with dictionary input."""
         message = {"message": "Test notification", "priority": "high"}
@@ -87,13 +96,10 @@ class TestNotificationService:
         mock_connection_manager.broadcast.assert_called_once()
 
         # Verify the message was properly formatted
-        call_args = mock_connection_manager.broadcast.call_args[0][0]
-        assert "id" in call_args
-        assert "type" in call_args
-        assert "timestamp" in call_args
-        assert call_args["data"] == message
+        sent = mock_connection_manager.broadcast.call_args.args[0]
+        assert {"id", "type", "timestamp"} <= sent.keys()
+        assert sent["data"] == message
 
-    @pytest.mark.asyncio
     async def test_send_notification_string(self, notification_service, mock_connection_manager):
         """Test sending a notification with string input."""
         message = "Simple test message"
@@ -104,10 +110,9 @@ class TestNotificationService:
         mock_connection_manager.broadcast.assert_called_once()
 
         # Verify the message was properly formatted
-        call_args = mock_connection_manager.broadcast.call_args[0][0]
-        assert call_args["data"]["message"] == message
+        sent = mock_connection_manager.broadcast.call_args.args[0]
+        assert sent["data"]["message"] == message
 
-    @pytest.mark.asyncio
     async def test_send_notification_error(self, notification_service, mock_connection_manager):
         """Test sending notification when broadcast fails."""
         mock_connection_manager.broadcast.side_effect = Exception("Broadcast failed")
@@ -116,7 +121,6 @@ class TestNotificationService:
 
         assert recipients == 0
 
-    @pytest.mark.asyncio
     async def test_create_test_notification(self, notification_service):
         """Test creating a test notification."""
         notification = await notification_service.create_test_notification()
@@ -135,7 +139,6 @@ class TestNotificationService:
         assert "active_connections" in data
         assert "server_time" in data
 
-    @pytest.mark.asyncio
     async def test_send_test_notification(self, notification_service, mock_connection_manager):
         """Test sending a test notification."""
         recipients = await notification_service.send_test_notification()
@@ -144,11 +147,10 @@ class TestNotificationService:
         mock_connection_manager.broadcast.assert_called_once()
 
         # Verify it was a test notification
-        call_args = mock_connection_manager.broadcast.call_args[0][0]
-        assert call_args["type"] == "test_notification"
-        assert call_args["sender"] == "notification_service"
+        sent = mock_connection_manager.broadcast.call_args.args[0]
+        assert sent["type"] == "test_notification"
+        assert sent["sender"] == "notification_service"
 
-    @pytest.mark.asyncio
     async def test_send_custom_notification(self, notification_service, mock_connection_manager):
         """Test sending a custom notification."""
         message = "Custom message"
@@ -163,14 +165,14 @@ class TestNotificationService:
         mock_connection_manager.broadcast.assert_called_once()
 
         # Verify the notification format
-        call_args = mock_connection_manager.broadcast.call_args[0][0]
-        assert call_args["type"] == notification_type
-        assert call_args["sender"] == "notification_service"
-        assert call_args["data"]["message"] == message
-        assert call_args["data"]["priority"] == "high"
-        assert call_args["data"]["category"] == "system"
-
-    @pytest.mark.asyncio
+        sent = mock_connection_manager.broadcast.call_args.args[0]
+        assert sent["type"] == notification_type
+        assert sent["sender"] == "notification_service"
+        sent_data = sent["data"]
+        assert sent_data["message"] == message
+        assert sent_data["priority"] == "high"
+        assert sent_data["category"] == "system"
+
     async def test_send_system_notification(self, notification_service, mock_connection_manager):
         """Test sending a system notification."""
         message = "System maintenance"
@@ -182,13 +184,13 @@ class TestNotificationService:
         mock_connection_manager.broadcast.assert_called_once()
 
         # Verify the notification format
-        call_args = mock_connection_manager.broadcast.call_args[0][0]
-        assert call_args["type"] == "system"
-        assert call_args["sender"] == "system"
-        assert call_args["data"]["message"] == message
-        assert call_args["data"]["priority"] == priority
+        sent = mock_connection_manager.broadcast.call_args.args[0]
+        assert sent["type"] == "system"
+        assert sent["sender"] == "system"
+        sent_data = sent["data"]
+        assert sent_data["message"] == message
+        assert sent_data["priority"] == priority
 
-    @pytest.mark.asyncio
     async def test_get_service_stats(self, notification_service, mock_connection_manager):
         """Test getting service statistics."""
         # Send a test notification to increment counter
@@ -208,7 +210,6 @@ class TestNotificationService:
         assert stats["active_connections"] == 5
         assert stats["total_connections"] == 100
 
-    @pytest.mark.asyncio
     async def test_cleanup(self, notification_service):
         """Test service cleanup."""
         # Start notifications
@@ -220,7 +221,6 @@ class TestNotificationService:
 
         assert not notification_service._is_running
 
-    @pytest.mark.asyncio
     async def test_notification_counter_increment(self, notification_service):
         """Test that notification counter increments correctly."""
         initial_stats = await notification_service.get_service_stats()
@@ -235,21 +235,37 @@ class TestNotificationService:
 
         assert final_count == initial_count + 2
 
-    @pytest.mark.asyncio
     async def test_periodic_notification_loop_short_run(self, notification_service, mock_connection_manager):
         """Test periodic notification loop runs correctly."""
+        broadcast_done = asyncio.Event()
+
+        def record_broadcast(message):
+            broadcast_done.set()
+            return 5
+
+        mock_connection_manager.broadcast.side_effect = record_broadcast
+
         # Mock settings to have a very short interval for testing
         with patch('websocket_server.services.notification_service.settings') as mock_settings:
-            mock_settings.notification_interval = 0.1  # 100ms for fast testing
+            mock_settings.notification_interval = 0.001
 
             # Start periodic notifications
             await notification_service.start_periodic_notifications()
 
-            # Wait a short time for at least one notification
-            await asyncio.sleep(0.2)
+            # Wait for the first broadcast instead of a fixed sleep
+            await asyncio.wait_for(broadcast_done.wait(), timeout=1.0)
 
             # Stop notifications
             await notification_service.stop_periodic_notifications()
 
             # Verify at least one broadcast was made
             assert mock_connection_manager.broadcast.call_count >= 1
+
+    async def test_wait_for_first_notification(self, notification_service, mock_connection_manager):
+        """Test waiting for the first periodic notification."""
+        await notification_service.start_periodic_notifications()
+
+        await asyncio.wait_for(notification_service.wait_for_first_notification(), timeout=1.0)
+        assert mock_connection_manager.broadcast.call_count == 1
+
+        await notification_service.stop_periodic_notifications()
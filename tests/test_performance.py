@@ -1,60 +1,111 @@
 """Load and performance tests for WebSocket Notification Server."""
 
 import asyncio
-import time
-from unittest.mock import patch
-
+import gc
+import os
+import threading
+import tracemalloc
+from collections import deque
+from time import perf_counter_ns
+from unittest.mock import AsyncMock, patch
+
+import orjson
+import psutil
 import pytest
 
-from websocket_server.app import app
-from websocket_server.services.connection_manager import ConnectionManager
+from tests._fakews import FakeWS
+from websocket_server.config.settings import settings
 from websocket_server.services.notification_service import NotificationService
 
+# Opt in to wall-clock pacing in the load tests; by default they only yield
+REALISTIC_TIMING = os.getenv("WS_REALISTIC_TIMING") == "1"
 
-class TestPerformance:
-    """Performance tests for core components."""
+# Number of mock WebSockets kept around for reuse by ws_factory
+WS_POOL_SIZE = 200
 
-    @pytest.mark.asyncio
-    async def test_connection_manager_performance(self):
-        """Test ConnectionManager performance with many connections."""
-        manager = ConnectionManager()
 
-        # Create mock WebSockets
-        mock_websockets = []
-        client_ids = []
+def _make_ws(user_agent: str) -> AsyncMock:
+    """
+    Build a lightweight mock WebSocket for ConnectionManager tests.
 
-        start_time = time.time()
+    ConnectionManager only touches headers, accept() and send_text(), so a
+    plain AsyncMock is enough; spec=WebSocket introspects the class on
+    every instantiation and dominated the setup time of these tests.
 
-        # Test connecting many clients
-        for i in range(100):
-            from unittest.mock import AsyncMock
+    Args:
+        user_agent: Value for the user-agent header
 
-            from fastapi import WebSocket
+    Returns:
+        Mock WebSocket instance
+    """
+    ws = AsyncMock()
+    ws.headers = {"user-agent": user_agent}
+    ws.accept = AsyncMock()
+    ws.send_text = AsyncMock()
+    return ws
 
-            ws = AsyncMock(spec=WebSocket)
-            ws.headers = {"user-agent": f"test-client-{i}"}
-            ws.accept = AsyncMock()
-            ws.send_json = AsyncMock()
 
-            client_id = f"client_{i}"
-            client_ids.append(client_id)
-            mock_websockets.append(ws)
+@pytest.fixture(scope="module")
+def ws_pool():
+    """Pre-build mock WebSockets once per module for reuse across tests."""
+    return [_make_ws("pooled-client") for _ in range(WS_POOL_SIZE)]
 
-            await manager.connect(ws, client_id)
 
-        connect_time = time.time() - start_time
+@pytest.fixture
+def ws_factory(ws_pool):
+    """
+    Hand out mock WebSockets from the shared pool.
 
-        # Test broadcasting to all clients
-        start_time = time.time()
+    Falls back to building new mocks once the pool runs dry. Handed-out
+    mocks are reset and returned to the pool when the test finishes.
+
+    Yields:
+        Callable taking a user-agent string and returning a mock WebSocket
+    """
+    borrowed = []
+
+    def factory(user_agent: str) -> AsyncMock:
+        ws = ws_pool.pop() if ws_pool else _make_ws(user_agent)
+        ws.headers = {"user-agent": user_agent}
+        borrowed.append(ws)
+        return ws
+
+    yield factory
+
+    for ws in borrowed[:WS_POOL_SIZE - len(ws_pool)]:
+        ws.reset_mock()
+        ws_pool.append(ws)
+
+
+class TestPerformance:
+    """Performance tests for core components."""
+
+    async def test_connection_manager_performance(self, fresh_manager, ws_factory):
+        """Test ConnectionManager performance with many connections."""
+        # Build the mocks up front so the timers only cover the manager
+        mock_websockets = [ws_factory(f"test-client-{i}") for i in range(100)]
+        client_ids = [f"client_{i}" for i in range(100)]
         message = {"type": "test", "data": "performance test"}
-        recipients = await manager.broadcast(message)
-        broadcast_time = time.time() - start_time
+
+        # Test connecting many clients, issued concurrently
+        start_time = perf_counter_ns()
+        await asyncio.gather(*(
+            fresh_manager.connect(ws, client_id)
+            for ws, client_id in zip(mock_websockets, client_ids, strict=True)
+        ))
+
+        connect_time = (perf_counter_ns() - start_time) / 1e9
+
+        # Test broadcasting to all clients
+        start_time = perf_counter_ns()
+        recipients = await fresh_manager.broadcast(message)
+        await fresh_manager.flush()
+        broadcast_time = (perf_counter_ns() - start_time) / 1e9
 
         # Test disconnecting all clients
-        start_time = time.time()
-        for client_id in client_ids:
-            await manager.disconnect(client_id)
-        disconnect_time = time.time() - start_time
+        start_time = perf_counter_ns()
+        await asyncio.gather(*(fresh_manager.disconnect(client_id) for client_id in client_ids))
+        disconnect_time = (perf_counter_ns() - start_time) / 1e9
 
         # Performance assertions (adjust thresholds as needed)
         assert connect_time < 1.0, f"Connecting 100 clients took {connect_time:.2f}s"
@@ -62,11 +113,8 @@ class TestPerformance:
         assert disconnect_time < 0.5, f"Disconnecting 100 clients took {disconnect_time:.2f}s"
         assert recipients == 100, f"Expected 100 recipients, got {recipients}"
 
-    @pytest.mark.asyncio
     async def test_notification_service_performance(self):
         """Test NotificationService performance."""
-        from unittest.mock import AsyncMock
-
         # Mock connection manager
         mock_manager = AsyncMock()
         mock_manager.broadcast = AsyncMock(return_value=100)
@@ -76,48 +124,51 @@ class TestPerformance:
         service = NotificationService(mock_manager)
 
         # Test rapid notification sending
-        start_time = time.time()
+        start_time = perf_counter_ns()
 
         tasks = []
         for i in range(50):
-            task = service.send_notification({"message": f"Test {i}"})
+            # Fixed-width text so every payload has the same shape and size
+            task = service.send_notification({"message": f"Test {i:02d}"})
             tasks.append(task)
 
         results = await asyncio.gather(*tasks)
 
-        send_time = time.time() - start_time
+        send_time = (perf_counter_ns() - start_time) / 1e9
 
         # Performance assertions
         assert send_time < 2.0, f"Sending 50 notifications took {send_time:.2f}s"
+        per_call = send_time / 50
+        assert per_call < 0.001, f"Each notification took {per_call * 1e3:.3f}ms"
         assert all(r == 100 for r in results), "Not all notifications were delivered"
 
-    @pytest.mark.asyncio
-    async def test_concurrent_connections(self):
+        # Same-shape input must produce same-size output. The timestamp is
+        # left out because its fractional seconds are dropped when zero.
+        payload_sizes = {
+            len(orjson.dumps({k: v for k, v in call.args[0].items() if k != "timestamp"}))
+            for call in mock_manager.broadcast.call_args_list
+        }
+        assert len(payload_sizes) == 1, f"Payload sizes varied: {sorted(payload_sizes)}"
+
+    async def test_concurrent_connections(self, fresh_manager, ws_factory):
         """Test handling concurrent connection attempts."""
-        manager = ConnectionManager()
 
         async def connect_client(client_id):
-            from unittest.mock import AsyncMock
-
-            from fastapi import WebSocket
-
-            ws = AsyncMock(spec=WebSocket)
-            ws.headers = {"user-agent": f"test-client-{client_id}"}
-            ws.accept = AsyncMock()
+            ws = ws_factory(f"test-client-{client_id}")
 
             try:
-                await manager.connect(ws, f"client_{client_id}")
+                await fresh_manager.connect(ws, f"client_{client_id}")
                 return True
             except Exception:
                 return False
 
         # Test concurrent connections
-        start_time = time.time()
+        start_time = perf_counter_ns()
 
         tasks = [connect_client(i) for i in range(50)]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        concurrent_time = time.time() - start_time
+        concurrent_time = (perf_counter_ns() - start_time) / 1e9
 
         # Count successful connections
         successful = sum(1 for r in results if r is True)
@@ -126,132 +177,127 @@ class TestPerformance:
         assert concurrent_time < 2.0, f"50 concurrent connections took {concurrent_time:.2f}s"
         assert successful >= 45, f"Only {successful}/50 connections succeeded"
 
-    @pytest.mark.asyncio
-    async def test_memory_usage_under_load(self):
+    async def test_memory_usage_under_load(self, fresh_manager):
         """Test memory usage doesn't grow excessively under load."""
-        import os
-
-        import psutil
-
-        process = psutil.Process(os.getpid())
-        initial_memory = process.memory_info().rss / 1024 / 1024  # MB
-
-        manager = ConnectionManager()
-
-        # Create and destroy many connections
-        for batch in range(10):
-            # Connect 50 clients
-            websockets = []
-            client_ids = []
-
-            for i in range(50):
-                from unittest.mock import AsyncMock
-
-                from fastapi import WebSocket
-
-                ws = AsyncMock(spec=WebSocket)
-                ws.headers = {"user-agent": f"test-client-{batch}-{i}"}
-                ws.accept = AsyncMock()
-                ws.send_json = AsyncMock()
-
-                client_id = f"client_{batch}_{i}"
-                client_ids.append(client_id)
-                websockets.append(ws)
-
-                await manager.connect(ws, client_id)
-
-            # Broadcast some messages
-            for _ in range(5):
-                await manager.broadcast({"type": "test", "data": f"batch_{batch}"})
-
-            # Disconnect all clients
-            for client_id in client_ids:
-                await manager.disconnect(client_id)
+        # Trace Python allocations directly: RSS also counts allocator
+        # arenas and fragmentation, which made the old 50MB slack necessary
+        tracemalloc.start()
+        try:
+            # Move everything alive so far (modules, fixtures) out of the
+            # collector's generations, then keep GC pauses out of the workload
+            gc.collect()
+            gc.freeze()
+            initial_snapshot = tracemalloc.take_snapshot()
 
-            # Force garbage collection
-            import gc
+            gc.disable()
+            try:
+                # Create and destroy many connections
+                for batch in range(10):
+                    # Connect 50 clients
+                    websockets = [FakeWS(f"test-client-{batch}-{i}") for i in range(50)]
+                    client_ids = [f"client_{batch}_{i}" for i in range(50)]
+                    await asyncio.gather(*(
+                        fresh_manager.connect(ws, client_id)
+                        for ws, client_id in zip(websockets, client_ids, strict=True)
+                    ))
+
+                    # Broadcast some messages
+                    for _ in range(5):
+                        await fresh_manager.broadcast({"type": "test", "data": f"batch_{batch}"})
+
+                    # Disconnect all clients
+                    await asyncio.gather(*(fresh_manager.disconnect(client_id) for client_id in client_ids))
+            finally:
+                gc.enable()
+                gc.unfreeze()
+
+            # Drop the last batch of fakes so only the manager's state is left,
+            # then collect once for the whole run
+            del websockets
             gc.collect()
+            final_snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
 
-        final_memory = process.memory_info().rss / 1024 / 1024  # MB
-        memory_growth = final_memory - initial_memory
+        top_stats = final_snapshot.compare_to(initial_snapshot, "lineno")
+        memory_growth = sum(stat.size_diff for stat in top_stats)
 
-        # Memory should not grow excessively (allow some growth for test overhead)
-        assert memory_growth < 50, f"Memory grew by {memory_growth:.2f}MB during load test"
+        # Memory should not grow once all clients are gone
+        top = "\n".join(str(stat) for stat in top_stats[:10])
+        assert memory_growth < 2 * 1024 * 1024, (
+            f"Memory grew by {memory_growth / 1024:.1f}KB during load test:\n{top}"
+        )
 
-    def test_http_endpoint_performance(self):
+    def test_http_endpoint_performance(self, http_client):
         """Test HTTP endpoint performance."""
-        from fastapi.testclient import TestClient
-
-        client = TestClient(app)
-
-        # Test health endpoint performance
-        start_time = time.time()
-
-        for _ in range(100):
-            response = client.get("/health")
-            assert response.status_code == 200
-
-        health_time = time.time() - start_time
-
-        # Test notification endpoint performance
         notification_data = {
             "message": "Performance test notification",
             "type": "test"
         }
+        # Encode the payload once instead of on every post
+        notification_body = orjson.dumps(notification_data)
+        json_headers = {"content-type": "application/json"}
 
-        start_time = time.time()
+        # Test health endpoint performance
+        start_time = perf_counter_ns()
+        health_statuses = [http_client.get("/health").status_code for _ in range(100)]
+        health_time = (perf_counter_ns() - start_time) / 1e9
 
-        for _ in range(50):
-            response = client.post("/notify", json=notification_data)
-            assert response.status_code == 200
+        # Test notification endpoint performance
+        start_time = perf_counter_ns()
+        notify_statuses = [
+            http_client.post("/notify", content=notification_body, headers=json_headers).status_code
+            for _ in range(50)
+        ]
+        notify_time = (perf_counter_ns() - start_time) / 1e9
 
-        notify_time = time.time() - start_time
+        assert all(status == 200 for status in health_statuses)
+        assert all(status == 200 for status in notify_statuses)
 
         # Performance assertions
         assert health_time < 5.0, f"100 health checks took {health_time:.2f}s"
         assert notify_time < 10.0, f"50 notifications took {notify_time:.2f}s"
 
+    async def test_http_endpoint_concurrent_load(self, async_client):
+        """Test HTTP endpoint performance under concurrent requests."""
+        start_time = perf_counter_ns()
+        responses = await asyncio.gather(*(async_client.get("/health") for _ in range(100)))
+        concurrent_time = (perf_counter_ns() - start_time) / 1e9
+
+        assert all(response.status_code == 200 for response in responses)
+        assert concurrent_time < 5.0, f"100 concurrent health checks took {concurrent_time:.2f}s"
+
 
 class TestLoadTesting:
     """Load testing scenarios."""
 
-    @pytest.mark.asyncio
     @pytest.mark.slow
-    async def test_sustained_load(self):
+    async def test_sustained_load(self, fresh_manager, ws_factory):
         """Test server under sustained load."""
         # This test simulates sustained load over time
         # Mark as slow since it takes longer to run
 
-        manager = ConnectionManager()
-
         # Simulate sustained connections
         active_connections = []
 
         try:
             # Gradually build up connections
             for i in range(200):
-                from unittest.mock import AsyncMock
-
-                from fastapi import WebSocket
-
-                ws = AsyncMock(spec=WebSocket)
-                ws.headers = {"user-agent": f"sustained-client-{i}"}
-                ws.accept = AsyncMock()
-                ws.send_json = AsyncMock()
+                ws = ws_factory(f"sustained-client-{i}")
 
                 client_id = f"sustained_client_{i}"
-                await manager.connect(ws, client_id)
+                await fresh_manager.connect(ws, client_id)
                 active_connections.append((ws, client_id))
 
                 # Add small delay to simulate realistic connection pattern
                 if i % 10 == 0:
-                    await asyncio.sleep(0.1)
+                    await asyncio.sleep(0.1 if REALISTIC_TIMING else 0)
 
             # Maintain load for a period
             for round_num in range(10):
                 # Broadcast messages
                 message = {"type": "load_test", "round": round_num}
-                recipients = await manager.broadcast(message)
+                recipients = await fresh_manager.broadcast(message)
                 assert recipients == len(active_connections)
 
                 # Simulate some disconnections and reconnections
@@ -261,36 +307,27 @@ class TestLoadTesting:
                     for _ in range(disconnect_count):
                         if active_connections:
                             ws, client_id = active_connections.pop()
-                            await manager.disconnect(client_id)
+                            await fresh_manager.disconnect(client_id)
 
                     # Reconnect new clients
                     for i in range(disconnect_count):
-                        from unittest.mock import AsyncMock
-
-                        from fastapi import WebSocket
-
-                        ws = AsyncMock(spec=WebSocket)
-                        ws.headers = {"user-agent": f"reconnect-client-{round_num}-{i}"}
-                        ws.accept = AsyncMock()
-                        ws.send_json = AsyncMock()
+                        ws = ws_factory(f"reconnect-client-{round_num}-{i}")
 
                         client_id = f"reconnect_client_{round_num}_{i}"
-                        await manager.connect(ws, client_id)
+                        await fresh_manager.connect(ws, client_id)
                         active_connections.append((ws, client_id))
 
-                await asyncio.sleep(0.5)  # Brief pause between rounds
+                # Brief pause between rounds
+                await asyncio.sleep(0.5 if REALISTIC_TIMING else 0)
 
         finally:
             # Clean up all connections
             for ws, client_id in active_connections:
-                await manager.disconnect(client_id)
+                await fresh_manager.disconnect(client_id)
 
-    @pytest.mark.asyncio
     @pytest.mark.slow
-    async def test_connection_churn(self):
+    async def test_connection_churn(self, fresh_manager, ws_factory):
         """Test rapid connection and disconnection (churn)."""
-        manager = ConnectionManager()
-
         # Test rapid connect/disconnect cycles
         for cycle in range(20):
             connections = []
@@ -298,18 +335,12 @@ class TestLoadTesting:
             # Rapid connections
             connect_tasks = []
             for i in range(25):
-                from unittest.mock import AsyncMock
-
-                from fastapi import WebSocket
-
-                ws = AsyncMock(spec=WebSocket)
-                ws.headers = {"user-agent": f"churn-client-{cycle}-{i}"}
-                ws.accept = AsyncMock()
+                ws = ws_factory(f"churn-client-{cycle}-{i}")
 
                 client_id = f"churn_client_{cycle}_{i}"
                 connections.append((ws, client_id))
 
-                task = manager.connect(ws, client_id)
+                task = fresh_manager.connect(ws, client_id)
                 connect_tasks.append(task)
 
             # Wait for all connections
@@ -318,181 +349,179 @@ class TestLoadTesting:
             # Rapid disconnections
             disconnect_tasks = []
             for ws, client_id in connections:
-                task = manager.disconnect(client_id)
+                task = fresh_manager.disconnect(client_id)
                 disconnect_tasks.append(task)
 
             # Wait for all disconnections
             await asyncio.gather(*disconnect_tasks)
 
             # Verify clean state
-            assert await manager.get_connection_count() == 0
+            assert await fresh_manager.get_connection_count() == 0
 
-    @pytest.mark.asyncio
-    async def test_broadcast_performance_scaling(self):
+    @pytest.mark.parametrize("count", [10, 50, 100, 200])
+    async def test_broadcast_performance_scaling(self, fresh_manager, ws_factory, count):
         """Test broadcast performance with increasing connection counts."""
-        manager = ConnectionManager()
-
-        connection_counts = [10, 50, 100, 200]
-        broadcast_times = []
+        # Connections are keyed by client_id only, so one mock can back them all
+        shared_ws = ws_factory("scale-client")
 
-        for count in connection_counts:
-            # Set up connections
-            connections = []
-            for i in range(count):
-                from unittest.mock import AsyncMock
+        # Set up connections
+        client_ids = [f"scale_client_{i}" for i in range(count)]
+        await asyncio.gather(*(
+            fresh_manager.connect(shared_ws, client_id) for client_id in client_ids
+        ))
 
-                from fastapi import WebSocket
+        # Measure broadcast time
+        message = {"type": "scale_test", "connection_count": count}
 
-                ws = AsyncMock(spec=WebSocket)
-                ws.headers = {"user-agent": f"scale-client-{i}"}
-                ws.accept = AsyncMock()
-                ws.send_json = AsyncMock()
-
-                client_id = f"scale_client_{i}"
-                await manager.connect(ws, client_id)
-                connections.append((ws, client_id))
+        start_time = perf_counter_ns()
+        recipients = await fresh_manager.broadcast(message)
+        await fresh_manager.flush()
+        broadcast_time = (perf_counter_ns() - start_time) / 1e9
 
-            # Measure broadcast time
-            message = {"type": "scale_test", "connection_count": count}
+        assert recipients == count
+        assert shared_ws.send_text.await_count == count
 
-            start_time = time.time()
-            recipients = await manager.broadcast(message)
-            broadcast_time = time.time() - start_time
+        # Broadcast should stay roughly linear: bound the cost per client
+        # (same budget as the 100 clients in 0.5s check above)
+        per_client = broadcast_time / count
+        assert per_client < 0.005, f"Broadcast to {count} clients took {broadcast_time:.3f}s"
 
-            broadcast_times.append(broadcast_time)
+        # Clean up
+        await asyncio.gather(*(fresh_manager.disconnect(client_id) for client_id in client_ids))
 
-            assert recipients == count
+    async def test_load_test_scenario_samples_memory(self):
+        """Test run_load_test_scenario records a memory timeline."""
+        async def scenario(value):
+            await asyncio.sleep(0.05)
+            return value
 
-            # Clean up
-            for ws, client_id in connections:
-                await manager.disconnect(client_id)
+        metrics = await run_load_test_scenario(scenario, 42, sample_interval=0.005)
 
-        # Verify broadcast time scales reasonably (should be roughly linear)
-        # Allow for some variance in timing - performance tests can be flaky
-        for i in range(1, len(broadcast_times)):
-            ratio = broadcast_times[i] / broadcast_times[0]
-            connection_ratio = connection_counts[i] / connection_counts[0]
-
-            # Broadcast time should not grow faster than O(n^2) - very lenient for CI
-            # In practice it should be much better, but timing can vary significantly
-            assert ratio < connection_ratio * 50, f"Broadcast time scaling poorly: {ratio} vs {connection_ratio}"
+        assert metrics["result"] == 42
+        samples = metrics["memory_samples"]
+        assert samples, "No memory samples were recorded"
+        assert all(rss > 0 for _, rss in samples)
+        assert [ts for ts, _ in samples] == sorted(ts for ts, _ in samples)
 
 
 class TestStressScenarios:
     """Stress testing scenarios."""
 
-    @pytest.mark.asyncio
     @pytest.mark.stress
-    async def test_maximum_connections(self):
+    async def test_maximum_connections(self, fresh_manager, ws_factory):
         """Test behavior at maximum connection limit."""
         # Test with a smaller limit for testing
-        from websocket_server.config.settings import settings
         with patch.object(settings, 'max_connections', 50):
-            manager = ConnectionManager()
-
             connections = []
 
             # Connect up to the limit
             for i in range(50):
-                from unittest.mock import AsyncMock
-
-                from fastapi import WebSocket
-
-                ws = AsyncMock(spec=WebSocket)
-                ws.headers = {"user-agent": f"max-client-{i}"}
-                ws.accept = AsyncMock()
+                ws = ws_factory(f"max-client-{i}")
 
                 client_id = f"max_client_{i}"
-                await manager.connect(ws, client_id)
+                await fresh_manager.connect(ws, client_id)
                 connections.append((ws, client_id))
 
             # Try to connect one more (should fail)
-            ws_extra = AsyncMock(spec=WebSocket)
-            ws_extra.headers = {"user-agent": "extra-client"}
-            ws_extra.accept = AsyncMock()
+            ws_extra = ws_factory("extra-client")
 
             with pytest.raises(ValueError, match="Maximum connections exceeded"):
-                await manager.connect(ws_extra, "extra_client")
+                await fresh_manager.connect(ws_extra, "extra_client")
 
             # Clean up
             for ws, client_id in connections:
-                await manager.disconnect(client_id)
+                await fresh_manager.disconnect(client_id)
 
-    @pytest.mark.asyncio
     @pytest.mark.stress
-    async def test_rapid_message_broadcasting(self):
+    async def test_rapid_message_broadcasting(self, fresh_manager):
         """Test rapid message broadcasting."""
-        manager = ConnectionManager()
-
-        # Set up some connections
+        # Set up some connections; only delivery counts matter here, so
+        # plain fakes stand in for mocks
         connections = []
         for i in range(20):
-            from unittest.mock import AsyncMock
-
-            from fastapi import WebSocket
-
-            ws = AsyncMock(spec=WebSocket)
-            ws.headers = {"user-agent": f"rapid-client-{i}"}
-            ws.accept = AsyncMock()
-            ws.send_json = AsyncMock()
+            ws = FakeWS(f"rapid-client-{i}")
 
             client_id = f"rapid_client_{i}"
-            await manager.connect(ws, client_id)
+            await fresh_manager.connect(ws, client_id)
             connections.append((ws, client_id))
 
-        # Rapid message broadcasting
-        start_time = time.time()
-
-        broadcast_tasks = []
-        for i in range(100):
-            message = {"type": "rapid_test", "message_id": i}
-            task = manager.broadcast(message)
-            broadcast_tasks.append(task)
+        messages = [{"type": "rapid_test", "message_id": i} for i in range(100)]
 
-        results = await asyncio.gather(*broadcast_tasks)
+        # Rapid message broadcasting
+        start_time = perf_counter_ns()
+        results = await asyncio.gather(*(fresh_manager.broadcast(message) for message in messages))
+        await fresh_manager.flush()
 
-        broadcast_time = time.time() - start_time
+        broadcast_time = (perf_counter_ns() - start_time) / 1e9
 
         # Verify all broadcasts succeeded
         assert all(r == 20 for r in results), "Not all broadcasts succeeded"
+        # Frames may be coalesced into batches, but every message arrives in order
+        expected_ids = list(range(100))
+        for ws, _ in connections:
+            assert [m["message_id"] for m in ws.received()] == expected_ids
         assert broadcast_time < 5.0, f"100 rapid broadcasts took {broadcast_time:.2f}s"
 
         # Clean up
         for ws, client_id in connections:
-            await manager.disconnect(client_id)
+            await fresh_manager.disconnect(client_id)
 
 
 # Utility functions for load testing
 
-def run_load_test_scenario(scenario_func, *args, **kwargs):
-    """Run a load test scenario and collect metrics."""
-    import os
+async def run_load_test_scenario(scenario_func, *args, sample_interval=0.05, **kwargs):
+    """
+    Run a load test scenario and collect metrics.
 
-    import psutil
+    Memory is sampled from a background thread while the scenario runs, so
+    the timeline costs the measured event loop nothing.
 
+    Args:
+        scenario_func: Async callable implementing the scenario
+        *args: Positional arguments for scenario_func
+        sample_interval: Seconds between RSS samples
+        **kwargs: Keyword arguments for scenario_func
+
+    Returns:
+        Dictionary of metrics, including (perf_counter_ns, rss_bytes) samples
+    """
     process = psutil.Process(os.getpid())
 
     # Collect initial metrics
     initial_memory = process.memory_info().rss / 1024 / 1024  # MB
     process.cpu_percent()
 
-    start_time = time.time()
+    samples = deque(maxlen=10_000)
+    stop_sampling = threading.Event()
 
-    # Run the scenario
-    result = asyncio.run(scenario_func(*args, **kwargs))
+    def sampler():
+        while not stop_sampling.wait(sample_interval):
+            samples.append((perf_counter_ns(), process.memory_info().rss))
 
-    end_time = time.time()
+    sampler_thread = threading.Thread(target=sampler, name="load-test-sampler", daemon=True)
+    sampler_thread.start()
+
+    start_time = perf_counter_ns()
+
+    # Run the scenario
+    try:
+        result = await scenario_func(*args, **kwargs)
+    finally:
+        end_time = perf_counter_ns()
+        stop_sampling.set()
+        sampler_thread.join()
 
     # Collect final metrics
     final_memory = process.memory_info().rss / 1024 / 1024  # MB
     final_cpu = process.cpu_percent()
 
     metrics = {
-        "duration": end_time - start_time,
+        "duration": (end_time - start_time) / 1e9,
         "memory_growth": final_memory - initial_memory,
         "initial_memory": initial_memory,
         "final_memory": final_memory,
         "cpu_usage": final_cpu,
+        "memory_samples": list(samples),
         "result": result
     }
 
@@ -505,8 +534,6 @@ pytestmark = [
 ]
 
 
-
-
 # Example usage:
 # Run all performance tests: pytest tests/test_performance.py -v
 # Run only fast tests: pytest tests/test_performance.py -v -m "not slow"
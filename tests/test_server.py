@@ -1,202 +1,170 @@
-"""Simple test script to verify WebSocket server functionality."""
+"""
+Smoke tests against a running WebSocket Notification Server.
+
+Start the server first (``python main.py``), then run
+``pytest tests/test_server.py``. The tests are skipped when nothing is
+listening on localhost:8000.
+"""
 
 import asyncio
-import json
+import re
 import sys
-from datetime import datetime
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
 
 import aiohttp
+import orjson
 import pytest
-import websockets
+import pytest_asyncio
+
+BASE_URL = "http://localhost:8000"
+WS_URL = "ws://localhost:8000/ws"
+# Readiness probe: a few quick /health checks before the tests give up
+READY_ATTEMPTS = 5
+READY_DELAY = 0.05
+# Upper bound on waiting for the pong, so a missed reply fails instead of hanging
+PONG_TIMEOUT = 5.0
+
+# Sample line of the active-connections gauge, matched on the raw body
+ACTIVE_CONNECTIONS_RE = re.compile(
+    rb"^websocket_active_connections\s+(\d+)$", re.MULTILINE
+)
+
+# Formatted once per run; the checks only need a well-formed timestamp
+RUN_TIMESTAMP = datetime.now(UTC).isoformat()
+
+pytestmark = pytest.mark.integration
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create an HTTP session whose keep-alive pool is shared by all tests."""
+    # Cache DNS for the whole run so localhost is resolved only once
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=0, keepalive_timeout=30, ttl_dns_cache=300
+        )
+    )
+
+
+async def wait_until_ready(
+    session: aiohttp.ClientSession,
+    attempts: int = READY_ATTEMPTS,
+    delay: float = READY_DELAY,
+) -> bool:
+    """
+    Probe /health until the server answers 200.
+
+    Returns on the first healthy response, so a running server costs a
+    single request and no sleep.
+
+    Args:
+        session: Session to probe with
+        attempts: Number of probes before giving up
+        delay: Seconds to wait between failed probes
+
+    Returns:
+        True if the server became ready, False otherwise
+    """
+    for attempt in range(attempts):
+        try:
+            async with session.get(f"{BASE_URL}/health") as response:
+                if response.status == 200:
+                    return True
+        except aiohttp.ClientConnectionError:
+            pass
+        if attempt + 1 < attempts:
+            await asyncio.sleep(delay)
+    return False
+
+
+@pytest_asyncio.fixture(scope="session")
+async def session() -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Create one HTTP session for every test in the module.
 
+    Skips the tests when the server is not ready after a few quick probes.
+    """
+    async with create_session() as session:
+        if not await wait_until_ready(session):
+            pytest.skip(f"No server running at {BASE_URL}")
+        yield session
 
-@pytest.mark.asyncio
-async def test_health_endpoint():
+
+async def test_health_endpoint(session: aiohttp.ClientSession):
     """Test the health check endpoint."""
-    print("🔍 Testing health endpoint...")
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get("http://localhost:8000/health") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    print(f"✅ Health check passed: {data}")
-                    return True
-                else:
-                    print(f"❌ Health check failed with status: {response.status}")
-                    return False
-    except Exception as e:
-        print(f"❌ Health check failed: {e}")
-        return False
+    async with session.get(f"{BASE_URL}/health") as response:
+        assert response.status == 200
+        data = await response.json(loads=orjson.loads)
 
+    assert data["status"] == "healthy"
 
-@pytest.mark.asyncio
-async def test_websocket_connection():
+
+async def test_websocket_connection(session: aiohttp.ClientSession):
     """Test WebSocket connection and message exchange."""
-    print("🔍 Testing WebSocket connection...")
-    try:
-        uri = "ws://localhost:8000/ws"
-        async with websockets.connect(uri) as websocket:
-            print("✅ WebSocket connected successfully")
-            
-            # Send a ping message
-            ping_message = {"type": "ping", "timestamp": datetime.now().isoformat()}
-            await websocket.send(json.dumps(ping_message))
-            print(f"📤 Sent: {ping_message}")
-            
-            # Wait for a few messages (including periodic notifications)
-            message_count = 0
+    # Same session as the HTTP checks: one connector and event-loop layer
+    async with session.ws_connect(WS_URL) as websocket:
+        ping_message = {"type": "ping", "timestamp": RUN_TIMESTAMP}
+        await websocket.send_str(orjson.dumps(ping_message).decode())
+
+        # Read until the pong arrives; the welcome message comes first, and
+        # the server may coalesce both into one batch frame
+        received_types = []
+        async with asyncio.timeout(PONG_TIMEOUT):
             async for message in websocket:
-                try:
-                    data = json.loads(message)
-                    print(f"📥 Received: {data}")
-                    message_count += 1
-                    
-                    # Exit after receiving a few messages
-                    if message_count >= 3:
-                        break
-                        
-                except json.JSONDecodeError:
-                    print(f"📥 Received non-JSON message: {message}")
-                    
-            print("✅ WebSocket communication test completed")
-            return True
-            
-    except Exception as e:
-        print(f"❌ WebSocket test failed: {e}")
-        return False
-
-
-@pytest.mark.asyncio
-async def test_notification_endpoint():
+                assert message.type == aiohttp.WSMsgType.TEXT
+                data = orjson.loads(message.data)
+                items = data["items"] if data["type"] == "batch" else [data]
+                received_types.extend(item["type"] for item in items)
+                if "pong" in received_types:
+                    break
+
+    assert received_types[0] == "welcome"
+    assert "pong" in received_types
+
+
+async def test_notification_endpoint(session: aiohttp.ClientSession):
     """Test the notification broadcast endpoint."""
-    print("🔍 Testing notification endpoint...")
-    try:
-        notification_data = {
-            "message": "Test notification from test script",
-            "type": "test",
-            "data": {"source": "test_script", "timestamp": datetime.now().isoformat()}
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                "http://localhost:8000/notify",
-                json=notification_data
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    print(f"✅ Notification sent successfully: {data}")
-                    return True
-                else:
-                    print(f"❌ Notification failed with status: {response.status}")
-                    text = await response.text()
-                    print(f"Response: {text}")
-                    return False
-                    
-    except Exception as e:
-        print(f"❌ Notification test failed: {e}")
-        return False
-
-
-@pytest.mark.asyncio
-async def test_metrics_endpoint():
+    notification_data = {
+        "message": "Test notification from test script",
+        "type": "test",
+        "data": {"source": "test_script", "timestamp": RUN_TIMESTAMP}
+    }
+    # Encode once up front and post raw bytes, skipping aiohttp's json= path
+    body = orjson.dumps(notification_data)
+
+    async with session.post(
+        f"{BASE_URL}/notify",
+        data=body,
+        headers={"Content-Type": "application/json"},
+    ) as response:
+        assert response.status == 200, await response.text()
+        data = await response.json(loads=orjson.loads)
+
+    assert data["status"] == "success"
+
+
+async def test_metrics_endpoint(session: aiohttp.ClientSession):
     """Test the metrics endpoint."""
-    print("🔍 Testing metrics endpoint...")
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get("http://localhost:8000/metrics") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    print(f"✅ Metrics retrieved: {data}")
-                    return True
-                else:
-                    print(f"❌ Metrics failed with status: {response.status}")
-                    return False
-    except Exception as e:
-        print(f"❌ Metrics test failed: {e}")
-        return False
+    async with session.get(f"{BASE_URL}/metrics") as response:
+        assert response.status == 200
+        data = await response.json(loads=orjson.loads)
+
+    connections = data["connections"]
+    assert "active_connections" in connections
+    assert "messages_sent" in connections
 
 
-@pytest.mark.asyncio
-async def test_prometheus_metrics_endpoint():
+async def test_prometheus_metrics_endpoint(session: aiohttp.ClientSession):
     """Test the Prometheus metrics endpoint."""
-    print("🔍 Testing Prometheus metrics endpoint...")
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get("http://localhost:8000/metrics/prometheus") as response:
-                if response.status == 200:
-                    text = await response.text()
-                    # Check for expected Prometheus format
-                    if "# HELP websocket_active_connections" in text and "# TYPE websocket_active_connections gauge" in text:
-                        print(f"✅ Prometheus metrics retrieved successfully")
-                        print(f"   Sample: {text.split('websocket_active_connections')[1].split()[0]} active connections")
-                        return True
-                    else:
-                        print(f"❌ Prometheus metrics format invalid")
-                        return False
-                else:
-                    print(f"❌ Prometheus metrics failed with status: {response.status}")
-                    return False
-    except Exception as e:
-        print(f"❌ Prometheus metrics test failed: {e}")
-        return False
-
-
-async def main():
-    """Run all tests."""
-    print("🚀 Starting WebSocket Notification Server Tests")
-    print("=" * 50)
-    
-    tests = [
-        ("Health Check", test_health_endpoint),
-        ("WebSocket Connection", test_websocket_connection),
-        ("Notification Endpoint", test_notification_endpoint),
-        ("Metrics Endpoint", test_metrics_endpoint),
-        ("Prometheus Metrics", test_prometheus_metrics_endpoint),
-    ]
-    
-    results = []
-    
-    for test_name, test_func in tests:
-        print(f"\n📋 Running {test_name} test...")
-        try:
-            result = await test_func()
-            results.append((test_name, result))
-        except Exception as e:
-            print(f"❌ {test_name} test crashed: {e}")
-            results.append((test_name, False))
-        
-        # Small delay between tests
-        await asyncio.sleep(1)
-    
-    # Summary
-    print("\n" + "=" * 50)
-    print("📊 Test Results Summary:")
-    print("=" * 50)
-    
-    passed = 0
-    for test_name, result in results:
-        status = "✅ PASS" if result else "❌ FAIL"
-        print(f"{status} - {test_name}")
-        if result:
-            passed += 1
-    
-    print(f"\n🎯 Tests passed: {passed}/{len(results)}")
-    
-    if passed == len(results):
-        print("🎉 All tests passed! Server is working correctly.")
-        return 0
-    else:
-        print("⚠️  Some tests failed. Check the server configuration.")
-        return 1
+    async with session.get(f"{BASE_URL}/metrics/prometheus") as response:
+        assert response.status == 200
+        body = await response.read()
+
+    # Check for expected Prometheus format without decoding the body
+    assert b"# HELP websocket_active_connections" in body
+    assert b"# TYPE websocket_active_connections gauge" in body
+    assert ACTIVE_CONNECTIONS_RE.search(body), "active connections sample missing"
 
 
 if __name__ == "__main__":
-    try:
-        exit_code = asyncio.run(main())
-        sys.exit(exit_code)
-    except KeyboardInterrupt:
-        print("\n🛑 Tests interrupted by user")
-        sys.exit(1)
-    except Exception as e:
-        print(f"\n💥 Test runner crashed: {e}")
-        sys.exit(1)
\ No newline at end of file
+    sys.exit(pytest.main([__file__]))
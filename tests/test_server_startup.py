@@ -7,8 +7,6 @@ import signal
 import sys
 from pathlib import Path
 
-import pytest
-
 # Add project root to path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
@@ -18,7 +16,6 @@ from websocket_server.app import app
 from websocket_server.config import setup_logging
 
 
-@pytest.mark.asyncio
 async def test_server_startup():
     """Test that the server can start without logging errors."""
     try:
@@ -35,16 +32,22 @@ async def test_server_startup():
         
         logger.info("✅ All services imported successfully")
         
-        # Test notification service briefly
-        await notification_service.start_periodic_notifications()
+        # Test notification service briefly, reusing the loop if it is running
+        started_here = not notification_service.is_running()
+        if started_here:
+            await notification_service.start_periodic_notifications()
+        assert notification_service.is_running()
         logger.info("✅ Notification service started")
         
-        # Wait a short time to see if there are logging errors
-        await asyncio.sleep(2)
+        # Let the first notification go out to surface any logging errors
+        await asyncio.wait_for(
+            notification_service.wait_for_first_notification(), timeout=2.0
+        )
         
-        # Stop the service
-        await notification_service.stop_periodic_notifications()
-        logger.info("✅ Notification service stopped")
+        # Stop the service only if this test started it
+        if started_here:
+            await notification_service.stop_periodic_notifications()
+            logger.info("✅ Notification service stopped")
         
         logger.success("🎉 Server startup test completed successfully!")
         return True
@@ -55,5 +58,12 @@ async def test_server_startup():
 
 
 if __name__ == "__main__":
-    success = asyncio.run(test_server_startup())
+    try:
+        import uvloop
+
+        run = uvloop.run
+    except ImportError:  # uvloop is not available on Windows
+        run = asyncio.run
+
+    success = run(test_server_startup())
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -1,35 +1,58 @@
 """Unit tests for ShutdownHandler."""
 
+import asyncio
 import signal
 from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from tests._fakews import FakeWS
 from websocket_server.handlers.shutdown_handler import ShutdownHandler
 from websocket_server.services.connection_manager import ConnectionManager
 from websocket_server.services.notification_service import NotificationService
 
 
-@pytest.fixture
-def mock_connection_manager():
-    """Create a mock ConnectionManager for testing."""
-    manager = AsyncMock(spec=ConnectionManager)
+def _configure_connection_manager(manager):
+    """Install the default return values on a ConnectionManager mock."""
     manager.get_connection_count = AsyncMock(return_value=0)
     manager.cleanup_stale_connections = AsyncMock(return_value=0)
     manager.shutdown_all_connections = AsyncMock()
+
+
+def _configure_notification_service(service):
+    """Install the default return values on a NotificationService mock."""
+    service.stop_periodic_notifications = AsyncMock()
+    service.send_system_notification = AsyncMock(return_value=5)
+
+
+# spec= introspects the whole class, so the mocks are built once per module
+# and reset between tests instead of being rebuilt for every test.
+@pytest.fixture(scope="module")
+def mock_connection_manager():
+    """Create a mock ConnectionManager for testing."""
+    manager = AsyncMock(spec=ConnectionManager)
+    _configure_connection_manager(manager)
     return manager
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_notification_service():
     """Create a mock NotificationService for testing."""
     service = AsyncMock(spec=NotificationService)
-    service.stop_periodic_notifications = AsyncMock()
-    service.send_system_notification = AsyncMock(return_value=5)
+    _configure_notification_service(service)
     return service
 
 
+@pytest.fixture(autouse=True)
+def reset_shared_mocks(mock_connection_manager, mock_notification_service):
+    """Clear calls and per-test overrides left on the module-scoped mocks."""
+    mock_connection_manager.reset_mock(return_value=True, side_effect=True)
+    mock_notification_service.reset_mock(return_value=True, side_effect=True)
+    _configure_connection_manager(mock_connection_manager)
+    _configure_notification_service(mock_notification_service)
+
+
 @pytest.fixture
 def shutdown_handler(mock_connection_manager, mock_notification_service):
     """Create a ShutdownHandler instance for testing."""
@@ -65,6 +88,8 @@ class TestShutdownHandler:
                 assert shutdown_handler.is_shutdown_requested()
                 assert shutdown_handler._shutdown_start_time is not None
                 mock_create_task.assert_called_once()
+                # The patched create_task never schedules the coroutine
+                mock_create_task.call_args.args[0].close()
 
     def test_signal_handler_second_signal(self):
         """Test signal handler on second signal (ignores duplicate)."""
@@ -89,7 +114,6 @@ class TestShutdownHandler:
                 mock_create_task.assert_not_called()
                 mock_graceful_shutdown.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_graceful_shutdown_no_connections(self, shutdown_handler, mock_connection_manager, mock_notification_service):
         """Test graceful shutdown with no active connections."""
         # Set up shutdown state
@@ -108,7 +132,6 @@ class TestShutdownHandler:
         # Verify system notification was NOT sent (no connections)
         mock_notification_service.send_system_notification.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_graceful_shutdown_with_connections(self, shutdown_handler, mock_connection_manager, mock_notification_service):
         """Test graceful shutdown with active connections."""
         # Set up shutdown state
@@ -129,7 +152,6 @@ class TestShutdownHandler:
             # Verify system notification was sent
             mock_notification_service.send_system_notification.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_wait_for_connections_or_timeout_no_connections(self, shutdown_handler, mock_connection_manager):
         """Test waiting for connections when there are none."""
         shutdown_handler._shutdown_start_time = datetime.now(UTC)
@@ -141,7 +163,21 @@ class TestShutdownHandler:
         # Should have checked connection count at least once
         mock_connection_manager.get_connection_count.assert_called()
 
-    @pytest.mark.asyncio
+    async def test_wait_for_connections_wakes_on_last_disconnect(self, mock_notification_service):
+        """Test the wait ends as soon as the last client disconnects, not at the next check."""
+        manager = ConnectionManager()
+        handler = ShutdownHandler(manager, mock_notification_service)
+        handler._shutdown_start_time = datetime.now(UTC)
+        await manager.connect(FakeWS(), "last_client")
+
+        waiter = asyncio.create_task(handler.wait_for_connections_or_timeout())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await manager.disconnect("last_client")
+        # Well under the 5s check interval
+        await asyncio.wait_for(waiter, timeout=1.0)
+
     async def test_wait_for_connections_or_timeout_with_timeout(self, shutdown_handler, mock_connection_manager):
         """Test waiting for connections with timeout."""
         # Set shutdown time to past (simulate timeout)
@@ -157,14 +193,11 @@ class TestShutdownHandler:
             # Should have checked connection count
             mock_connection_manager.get_connection_count.assert_called()
 
-    def test_is_shutdown_requested_false(self, shutdown_handler):
-        """Test is_shutdown_requested when shutdown not requested."""
-        assert not shutdown_handler.is_shutdown_requested()
-
-    def test_is_shutdown_requested_true(self, shutdown_handler):
-        """Test is_shutdown_requested when shutdown is requested."""
-        shutdown_handler._shutdown_requested = True
-        assert shutdown_handler.is_shutdown_requested()
+    @pytest.mark.parametrize("requested", [False, True])
+    def test_is_shutdown_requested(self, shutdown_handler, requested):
+        """Test is_shutdown_requested reflects the shutdown flag."""
+        shutdown_handler._shutdown_requested = requested
+        assert shutdown_handler.is_shutdown_requested() is requested
 
     def test_get_shutdown_info_not_requested(self, shutdown_handler):
         """Test get_shutdown_info when shutdown not requested."""
@@ -187,31 +220,21 @@ class TestShutdownHandler:
         assert "elapsed_seconds" in info
         assert "remaining_seconds" in info
 
-    @pytest.mark.asyncio
     async def test_stop_services(self, shutdown_handler, mock_notification_service):
         """Test stopping application services."""
         await shutdown_handler._stop_services()
 
         mock_notification_service.stop_periodic_notifications.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_notify_clients_shutdown_no_connections(self, shutdown_handler, mock_connection_manager, mock_notification_service):
-        """Test notifying clients about shutdown when no connections."""
-        mock_connection_manager.get_connection_count.return_value = 0
-
-        await shutdown_handler._notify_clients_shutdown()
-
-        # Should not send notification if no connections
-        mock_notification_service.send_system_notification.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_notify_clients_shutdown_with_connections(self, shutdown_handler, mock_connection_manager, mock_notification_service):
-        """Test notifying clients about shutdown with active connections."""
-        mock_connection_manager.get_connection_count.return_value = 5
+    @pytest.mark.parametrize("count,expects_call", [(0, False), (5, True)])
+    async def test_notify_clients_shutdown(self, shutdown_handler, mock_connection_manager, mock_notification_service, count, expects_call):
+        """Test notifying clients about shutdown only when connections exist."""
+        mock_connection_manager.get_connection_count.return_value = count
 
         with patch('asyncio.sleep') as mock_sleep:
             await shutdown_handler._notify_clients_shutdown()
 
+        if expects_call:
             # Should send shutdown notification
             mock_notification_service.send_system_notification.assert_called_once_with(
                 message="Server is shutting down. Please reconnect later.",
@@ -220,34 +243,27 @@ class TestShutdownHandler:
 
             # Should wait briefly for clients to process
             mock_sleep.assert_called_once_with(2)
+        else:
+            # Should not send notification if no connections
+            mock_notification_service.send_system_notification.assert_not_called()
+            mock_sleep.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_force_close_connections_no_connections(self, shutdown_handler, mock_connection_manager):
-        """Test force closing connections when none exist."""
-        mock_connection_manager.get_connection_count.return_value = 0
-
-        await shutdown_handler._force_close_connections()
-
-        # Should not call shutdown if no connections
-        mock_connection_manager.shutdown_all_connections.assert_not_called()
-
-    @pytest.mark.asyncio
-    async def test_force_close_connections_with_connections(self, shutdown_handler, mock_connection_manager):
-        """Test force closing connections when they exist."""
-        # Mock connection counts: 5 before shutdown, 0 after
-        mock_connection_manager.get_connection_count.side_effect = [5, 0]
+    @pytest.mark.parametrize("counts,expects_call", [([0], False), ([5, 0], True)])
+    async def test_force_close_connections(self, shutdown_handler, mock_connection_manager, counts, expects_call):
+        """Test force closing connections only when they exist."""
+        # Connection counts before and (if closing) after shutdown
+        mock_connection_manager.get_connection_count.side_effect = counts
 
         await shutdown_handler._force_close_connections()
 
-        # Should call shutdown_all_connections
-        mock_connection_manager.shutdown_all_connections.assert_called_once()
+        assert mock_connection_manager.shutdown_all_connections.called is expects_call
 
     def test_restore_signal_handlers(self, shutdown_handler):
         """Test restoring original signal handlers."""
-        # Set up some mock original handlers
+        # Plain sentinels stand in for the original handlers
         shutdown_handler._original_handlers = {
-            signal.SIGTERM: MagicMock(),
-            signal.SIGINT: MagicMock()
+            signal.SIGTERM: object(),
+            signal.SIGINT: object()
         }
 
         with patch('signal.signal') as mock_signal:
@@ -256,7 +272,6 @@ class TestShutdownHandler:
             # Should restore both handlers
             assert mock_signal.call_count == 2
 
-    @pytest.mark.asyncio
     async def test_cleanup(self, shutdown_handler):
         """Test cleanup method."""
         with patch.object(shutdown_handler, 'restore_signal_handlers') as mock_restore:
@@ -264,7 +279,6 @@ class TestShutdownHandler:
 
             mock_restore.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_graceful_shutdown_error_handling(self, shutdown_handler, mock_connection_manager, mock_notification_service):
         """Test graceful shutdown handles errors properly."""
         # Set up shutdown state
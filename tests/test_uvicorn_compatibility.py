@@ -4,9 +4,24 @@ Test script to verify uvicorn compatibility.
 This script verifies that the application can be run with uvicorn as required.
 """
 
+from functools import cache
+
 from loguru import logger
 
 
+@cache
+def get_route_paths() -> frozenset[str]:
+    """
+    Collect the registered route paths once per process.
+
+    Returns:
+        Paths of every route on the FastAPI app
+    """
+    from websocket_server.app import app
+
+    return frozenset(route.path for route in app.routes)
+
+
 def test_uvicorn_import():
     """Test that the app can be imported for uvicorn."""
     # Test direct import (uvicorn main:app)
@@ -27,14 +42,14 @@ def test_uvicorn_import():
     logger.success("App is a valid FastAPI instance")
 
     # Check that WebSocket route exists
-    routes = [route.path for route in ws_app.routes]
-    assert "/ws" in routes, "WebSocket endpoint /ws should exist"
+    route_paths = get_route_paths()
+    assert "/ws" in route_paths, "WebSocket endpoint /ws should exist"
     logger.success("WebSocket endpoint /ws is registered")
 
     # Check that HTTP endpoints exist
     expected_endpoints = ["/health", "/notify", "/metrics", "/status"]
-    for endpoint in expected_endpoints:
-        assert endpoint in routes, f"Endpoint {endpoint} should exist"
+    missing = set(expected_endpoints) - route_paths
+    assert not missing, f"Endpoints {sorted(missing)} should exist"
     logger.success(f"All required HTTP endpoints exist: {expected_endpoints}")
 
     logger.success("🎉 All uvicorn compatibility tests passed!")
@@ -1,23 +1,26 @@
 """Integration tests for WebSocket functionality."""
 
 import asyncio
-import json
-from unittest.mock import patch
+import re
+from unittest.mock import AsyncMock, patch
 
+import orjson
 import pytest
 import websockets
-from fastapi.testclient import TestClient
 
-from websocket_server.app import app
+from tests._fakews import FakeWS
+from websocket_server.config import settings
+from websocket_server.dependencies import connection_manager, notification_service
+from websocket_server.serialization import decompress
 
 
 @pytest.fixture
-def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+def client(http_client):
+    """Use the session-wide TestClient instead of building one per test."""
+    return http_client
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def websocket_url():
     """WebSocket URL for testing."""
     return "ws://localhost:8000/ws"
@@ -26,7 +29,6 @@ def websocket_url():
 class TestWebSocketIntegration:
     """Integration tests for WebSocket functionality."""
 
-    @pytest.mark.asyncio
     async def test_websocket_connection_lifecycle(self):
         """Test complete WebSocket connection lifecycle."""
         # This test requires the server to be running
@@ -39,7 +41,7 @@ class TestWebSocketIntegration:
             pass
 
     def test_health_endpoint(self, client):
-        """Test the health check endpoint."""
+        """Test the health check endpoint through the sync TestClient."""
         response = client.get("/health")
         assert response.status_code == 200
 
@@ -49,7 +51,22 @@ class TestWebSocketIntegration:
         assert "timestamp" in data
         assert "connections" in data
 
-    def test_notify_endpoint(self, client):
+    async def test_health_endpoint_warning_matches_healthy_shape(self, async_client):
+        """Test the pre-encoded healthy body has the same fields as the warning body."""
+        healthy = (await async_client.get("/health")).json()
+        assert healthy["status"] == "healthy"
+
+        with patch.object(settings, "max_connections", 0):
+            warning = (await async_client.get("/health")).json()
+        assert warning["status"] == "warning"
+
+        for data in (healthy, warning):
+            data.pop("status")
+            data.pop("timestamp")
+            data["connections"].pop("max_allowed")
+        assert healthy == warning
+
+    async def test_notify_endpoint(self, async_client):
         """Test the notification endpoint."""
         notification_data = {
             "message": "Test notification",
@@ -57,7 +74,7 @@ class TestWebSocketIntegration:
             "data": {"priority": "normal"}
         }
 
-        response = client.post("/notify", json=notification_data)
+        response = await async_client.post("/notify", json=notification_data)
         assert response.status_code == 200
 
         data = response.json()
@@ -65,9 +82,25 @@ class TestWebSocketIntegration:
         assert "recipients" in data
         assert "notification" in data
 
-    def test_metrics_endpoint(self, client):
+    async def test_notify_endpoint_broadcasts_in_background(self, async_client):
+        """Test /notify responds first and then runs the broadcast."""
+        send = AsyncMock(return_value=0)
+
+        with patch.object(notification_service, "send_custom_notification", send):
+            response = await async_client.post(
+                "/notify", json={"message": "Background", "type": "test"}
+            )
+            assert response.status_code == 200
+            assert response.json()["recipients"] == 0
+
+        # The ASGI call returns once the response's background tasks have run
+        send.assert_awaited_once_with(
+            message="Background", notification_type="test", data=None
+        )
+
+    async def test_metrics_endpoint(self, async_client):
         """Test the metrics endpoint."""
-        response = client.get("/metrics")
+        response = await async_client.get("/metrics")
         assert response.status_code == 200
 
         data = response.json()
@@ -76,9 +109,9 @@ class TestWebSocketIntegration:
         assert "server" in data
         assert "timestamp" in data
 
-    def test_status_endpoint(self, client):
+    async def test_status_endpoint(self, async_client):
         """Test the status endpoint."""
-        response = client.get("/status")
+        response = await async_client.get("/status")
         assert response.status_code == 200
 
         data = response.json()
@@ -88,28 +121,48 @@ class TestWebSocketIntegration:
         assert "shutdown" in data
         assert "configuration" in data
 
-    def test_prometheus_metrics_endpoint(self, client):
+    async def test_status_endpoint_connection_details(self, async_client):
+        """Test /status lists connected clients with ISO 8601 timestamps."""
+        await connection_manager.connect(FakeWS(), "status_client")
+        try:
+            info = await connection_manager.get_connection_info("status_client")
+            response = await async_client.get("/status")
+        finally:
+            await connection_manager.disconnect("status_client")
+
+        details = {
+            entry["client_id"]: entry
+            for entry in response.json()["connections"]["details"]
+        }
+        assert details["status_client"] == {
+            "client_id": "status_client",
+            "connected_at": info.connected_at.isoformat(),
+            "last_ping": None,
+            "user_agent": info.user_agent,
+        }
+
+    async def test_prometheus_metrics_endpoint(self, async_client):
         """Test the Prometheus metrics endpoint."""
-        response = client.get("/metrics/prometheus")
+        response = await async_client.get("/metrics/prometheus")
         assert response.status_code == 200
-        assert response.headers["content-type"] == "text/plain; charset=utf-8"
+        assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
 
         content = response.text
         assert "websocket_active_connections" in content
         assert "websocket_total_connections" in content
         assert "websocket_notifications_sent" in content
 
-    def test_invalid_notify_request(self, client):
+    async def test_invalid_notify_request(self, async_client):
         """Test notification endpoint with invalid data."""
         # Missing required message field
         invalid_data = {
             "type": "test"
         }
 
-        response = client.post("/notify", json=invalid_data)
+        response = await async_client.post("/notify", json=invalid_data)
         assert response.status_code == 422  # Validation error
 
-    def test_notify_endpoint_during_shutdown(self, client):
+    async def test_notify_endpoint_during_shutdown(self, async_client):
         """Test notification endpoint when server is shutting down."""
         # This would require mocking the shutdown state
         # For now, test normal operation
@@ -118,7 +171,7 @@ class TestWebSocketIntegration:
             "type": "test"
         }
 
-        response = client.post("/notify", json=notification_data)
+        response = await async_client.post("/notify", json=notification_data)
         # Should work normally when not actually shutting down
         assert response.status_code == 200
 
@@ -126,7 +179,6 @@ class TestWebSocketIntegration:
 class TestWebSocketMessages:
     """Test WebSocket message handling."""
 
-    @pytest.mark.asyncio
     async def test_websocket_message_formats(self):
         """Test various WebSocket message formats."""
         # This would test actual WebSocket message exchange
@@ -142,7 +194,6 @@ class TestWebSocketMessages:
         # and responses would be verified
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_connection_with_client_id(self):
         """Test WebSocket connection with custom client ID."""
         # Test connecting with custom client ID
@@ -151,7 +202,6 @@ class TestWebSocketMessages:
         # In full test, would connect and verify welcome message contains client_id
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_connection_without_client_id(self):
         """Test WebSocket connection without client ID (auto-generated)."""
         # Test connecting without client ID
@@ -160,14 +210,12 @@ class TestWebSocketMessages:
         # In full test, would connect and verify auto-generated client_id
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_periodic_notifications(self):
         """Test receiving periodic notifications."""
         # Connect to WebSocket and wait for periodic notifications
         # Verify they arrive at expected intervals
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_broadcast_notification(self):
         """Test receiving broadcast notifications."""
         # Connect WebSocket client
@@ -175,43 +223,80 @@ class TestWebSocketMessages:
         # Verify WebSocket client receives the notification
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_connection_limit(self):
         """Test WebSocket connection limit enforcement."""
         # This would test connecting more clients than MAX_CONNECTIONS
         # and verify that excess connections are rejected
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_duplicate_client_id(self):
         """Test handling of duplicate client IDs."""
         # Connect with same client_id twice
         # Verify second connection is rejected
         pass
 
+    def test_websocket_binary_frame_ping(self, client):
+        """Test that a JSON ping sent as a binary frame gets a pong."""
+        with client.websocket_connect("/ws?client_id=binary_client") as websocket:
+            assert websocket.receive_json()["type"] == "welcome"
+
+            websocket.send_bytes(b'{"type": "ping"}')
+            assert websocket.receive_json()["type"] == "pong"
+
+            websocket.send_bytes(b"\xff\xfe")
+            response = websocket.receive_json()
+            assert response["type"] == "error"
+            assert response["message"] == "Invalid JSON format"
+
+    def test_websocket_generated_client_ids(self, client):
+        """Test clients without a client_id get distinct generated IDs."""
+        client_ids = []
+        for _ in range(2):
+            with client.websocket_connect("/ws") as websocket:
+                client_ids.append(websocket.receive_json()["client_id"])
+
+        assert all(re.fullmatch(r"client_[0-9a-f]{10,}", cid) for cid in client_ids)
+        assert client_ids[0] != client_ids[1]
+
+    def test_websocket_message_dispatch(self, client):
+        """Test each client message type reaches its handler."""
+        with client.websocket_connect("/ws?client_id=dispatch_client") as websocket:
+            assert websocket.receive_json()["type"] == "welcome"
+
+            websocket.send_json({"type": "ping"})
+            pong = websocket.receive_json()
+            assert pong["type"] == "pong"
+            assert pong["timestamp"].endswith("+00:00")
+
+            websocket.send_json({"type": "status_request"})
+            status = websocket.receive_json()
+            assert status["type"] == "status_response"
+            assert status["data"]["active_connections"] >= 1
+
+            websocket.send_json({"type": "bogus"})
+            error = websocket.receive_json()
+            assert error["type"] == "error"
+            assert error["message"] == "Unknown message type: bogus"
+
 
 class TestWebSocketErrorHandling:
     """Test WebSocket error handling scenarios."""
 
-    @pytest.mark.asyncio
     async def test_websocket_invalid_json(self):
         """Test sending invalid JSON to WebSocket."""
         # Send malformed JSON and verify error response
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_unknown_message_type(self):
         """Test sending unknown message type."""
         # Send message with unknown type and verify error response
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_connection_timeout(self):
         """Test WebSocket connection timeout handling."""
         # Connect and remain idle to test timeout behavior
         pass
 
-    @pytest.mark.asyncio
     async def test_websocket_connection_during_shutdown(self):
         """Test WebSocket connection attempt during shutdown."""
         # Attempt connection while server is shutting down
@@ -222,14 +307,12 @@ class TestWebSocketErrorHandling:
 class TestGracefulShutdown:
     """Test graceful shutdown scenarios."""
 
-    @pytest.mark.asyncio
     async def test_graceful_shutdown_no_connections(self):
         """Test graceful shutdown with no active connections."""
         # Trigger shutdown signal with no connections
         # Verify immediate shutdown
         pass
 
-    @pytest.mark.asyncio
     async def test_graceful_shutdown_with_connections(self):
         """Test graceful shutdown with active connections."""
         # Connect WebSocket clients
@@ -238,7 +321,6 @@ class TestGracefulShutdown:
         # Verify server waits for natural disconnection
         pass
 
-    @pytest.mark.asyncio
     async def test_graceful_shutdown_timeout(self):
         """Test graceful shutdown timeout."""
         # Connect WebSocket clients that don't disconnect
@@ -246,7 +328,6 @@ class TestGracefulShutdown:
         # Verify server force-closes after timeout
         pass
 
-    @pytest.mark.asyncio
     async def test_graceful_shutdown_multi_worker(self):
         """Test graceful shutdown with multiple workers."""
         # This would test shutdown coordination across workers
@@ -268,13 +349,18 @@ async def connect_websocket(url, client_id=None):
         pytest.fail(f"Failed to connect to WebSocket: {e}")
 
 
+def decode_frame(frame):
+    """Parse a received frame, decompressing binary "zlib" frames."""
+    return orjson.loads(decompress(frame) if isinstance(frame, bytes) else frame)
+
+
 async def send_and_receive(websocket, message, timeout=5):
     """Helper function to send message and receive response."""
-    await websocket.send(json.dumps(message))
+    await websocket.send(orjson.dumps(message), text=True)
 
     try:
         response = await asyncio.wait_for(websocket.recv(), timeout=timeout)
-        return json.loads(response)
+        return decode_frame(response)
     except TimeoutError:
         pytest.fail(f"Timeout waiting for response to {message}")
 
@@ -289,9 +375,12 @@ async def wait_for_message_type(websocket, message_type, timeout=10):
 
         try:
             message = await asyncio.wait_for(websocket.recv(), timeout=1)
-            data = json.loads(message)
-            if data.get("type") == message_type:
-                return data
+            data = decode_frame(message)
+            # Messages queued behind each other may arrive as one batch frame
+            items = data["items"] if data.get("type") == "batch" else [data]
+            for item in items:
+                if item.get("type") == message_type:
+                    return item
         except TimeoutError:
             continue
         except Exception as e:
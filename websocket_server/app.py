@@ -2,12 +2,19 @@
 
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
-from datetime import UTC, datetime
 
 from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 
-from .config import log_shutdown_info, log_startup_info, settings, setup_logging
+from .config import (
+    get_settings_snapshot,
+    iso_now,
+    log_shutdown_info,
+    log_startup_info,
+    settings,
+    setup_logging,
+)
 from .dependencies import (
     connection_manager,
     multi_worker_coordinator,
@@ -22,6 +29,7 @@ from .endpoints import (
     status_endpoint,
     websocket_endpoint,
 )
+from .serialization import ORJSONResponse
 
 
 @asynccontextmanager
@@ -33,7 +41,7 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         app: FastAPI application instance
     """
     # Startup
-    startup_time = datetime.now(UTC)
+    startup_time = iso_now()
 
     try:
         # Setup logging first
@@ -57,16 +65,9 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         logger.info(
             "WebSocket Notification Server started successfully",
             extra={
-                "startup_time": startup_time.isoformat(),
+                "startup_time": startup_time,
                 "worker_info": multi_worker_coordinator.get_worker_info(),
-                "settings": {
-                    "host": settings.host,
-                    "port": settings.port,
-                    "workers": settings.workers,
-                    "max_connections": settings.max_connections,
-                    "notification_interval": settings.notification_interval,
-                    "shutdown_timeout": settings.shutdown_timeout
-                }
+                "settings": get_settings_snapshot()
             }
         )
 
@@ -112,12 +113,12 @@ def create_app() -> FastAPI:
         version="0.1.0",
         docs_url="/docs" if settings.debug else None,
         redoc_url="/redoc" if settings.debug else None,
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
 
     # Add middleware for CORS if needed
     if settings.debug:
-        from fastapi.middleware.cors import CORSMiddleware
         app.add_middleware(
             CORSMiddleware,
             allow_origins=["*"],
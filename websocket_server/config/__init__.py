@@ -5,6 +5,8 @@ from .logging import (
     RequestLogger,
     WebSocketLogger,
     get_contextual_logger,
+    get_settings_snapshot,
+    iso_now,
     log_shutdown_info,
     log_startup_info,
     setup_logging,
@@ -16,6 +18,8 @@ __all__ = [
     "settings",
     "setup_logging",
     "get_contextual_logger",
+    "get_settings_snapshot",
+    "iso_now",
     "log_startup_info",
     "log_shutdown_info",
     "ContextualLogger",
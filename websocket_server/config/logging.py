@@ -1,14 +1,155 @@
 """Loguru structured logging configuration."""
 
+import glob
+import gzip
+import os
+import re
+import shutil
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
+from functools import cache, partial
 from pathlib import Path
 from typing import Any
 
 from loguru import logger
+from loguru._string_parsers import parse_duration
 
 from .settings import settings
 
+# Severity numbers looked up once instead of per record
+DEBUG_NO = logger.level("DEBUG").no
+INFO_NO = logger.level("INFO").no
+WARNING_NO = logger.level("WARNING").no
+
+# Loggers whose records only reach the console at WARNING and above
+NOISY_MODULES_RE = re.compile(r"uvicorn\.access|asyncio")
+
+# Rotated log files are gzipped at level 1: a few times cheaper than the
+# default level 9 for a slightly larger archive
+GZIP_COMPRESS_LEVEL = 1
+# Chunk size used when copying a rotated file into its archive
+GZIP_COPY_CHUNK = 1 << 20
+
+# Single background thread that compresses rotated files in order
+_compression_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-gzip")
+
+
+def _level_enabled(level_no: int) -> bool:
+    """
+    Check whether any sink would accept a record at the given severity.
+
+    Loguru keeps the lowest level accepted by any sink up to date as sinks
+    are added and removed, so this is a single comparison.
+
+    Args:
+        level_no: Severity number of the record
+
+    Returns:
+        True if at least one sink accepts the level
+    """
+    min_level: int = logger._core.min_level  # type: ignore[attr-defined]
+    return min_level <= level_no
+
+
+def _gzip_file(path: str) -> None:
+    """
+    Compress a rotated log file to path.gz and remove the original.
+
+    The original is only removed once the archive is complete.
+
+    Args:
+        path: Path of the rotated log file
+    """
+    with open(path, "rb") as src, gzip.open(
+        f"{path}.gz", "wb", compresslevel=GZIP_COMPRESS_LEVEL
+    ) as dst:
+        shutil.copyfileobj(src, dst, length=GZIP_COPY_CHUNK)
+    os.remove(path)
+
+
+def _compress_in_background(path: str) -> None:
+    """
+    Loguru compression hook that gzips a rotated file off the logging path.
+
+    Loguru calls this while holding the sink's lock, so compressing inline
+    would stall every log call until the archive is written.
+
+    Args:
+        path: Path of the rotated log file
+    """
+    _compression_pool.submit(_gzip_file, path)
+
+
+def _retain_all_workers(logs: list[str], pattern: str, max_age: float) -> None:
+    """
+    Loguru retention hook that prunes the log files of every worker.
+
+    Loguru only passes the files named after the sink itself, i.e. the
+    current pid's, so archives left behind by earlier worker pids would
+    never be removed. This globs the files of all pids instead.
+
+    Args:
+        logs: Files loguru matched for this sink (a subset of pattern)
+        pattern: Glob matching this sink's files across all worker pids
+        max_age: Age in seconds after which a file is removed
+    """
+    cutoff = time.time() - max_age
+    for path in glob.glob(pattern):
+        try:
+            if os.stat(path).st_mtime <= cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            # Another worker pruned it first
+            pass
+
+
+class _IsoTimestampCache:
+    """Formats epoch nanoseconds as UTC ISO 8601, like datetime.isoformat()."""
+
+    __slots__ = ("_cached",)
+
+    def __init__(self) -> None:
+        """Initialize with nothing cached."""
+        # (epoch second, "YYYY-MM-DDTHH:MM:SS"), swapped as one tuple so
+        # threads logging through enqueued sinks never see a torn pair
+        self._cached: tuple[int, str] = (-1, "")
+
+    def fmt(self, ns: int) -> str:
+        """
+        Format a timestamp, reformatting the date and time once per second.
+
+        Args:
+            ns: Nanoseconds since the epoch, as returned by time.time_ns()
+
+        Returns:
+            ISO 8601 timestamp with a +00:00 offset; like isoformat(), the
+            fraction is left out when the microseconds are zero
+        """
+        second, remainder = divmod(ns, 1_000_000_000)
+        cached_second, prefix = self._cached
+        if second != cached_second:
+            prefix = datetime.fromtimestamp(second, UTC).strftime("%Y-%m-%dT%H:%M:%S")
+            self._cached = (second, prefix)
+        microsecond = remainder // 1000
+        if microsecond:
+            return f"{prefix}.{microsecond:06d}+00:00"
+        return f"{prefix}+00:00"
+
+
+_ts_cache = _IsoTimestampCache()
+
+
+def iso_now() -> str:
+    """
+    Get the current UTC time as an ISO 8601 string without building a datetime.
+
+    Returns:
+        Current timestamp, e.g. "2023-12-01T12:00:00.000000+00:00"
+    """
+    return _ts_cache.fmt(time.time_ns())
+
 
 class LoguruConfig:
     """Loguru logging configuration manager."""
@@ -26,17 +167,18 @@ class LoguruConfig:
         # Remove default handler
         logger.remove()
 
-        # Create logs directory
-        self.log_dir.mkdir(exist_ok=True)
-
         # Configure console handler
         self._configure_console_handler()
 
-        # Configure file handler
-        self._configure_file_handler()
+        if settings.log_to_file:
+            # Create logs directory
+            self.log_dir.mkdir(exist_ok=True, parents=True)
 
-        # Configure error file handler
-        self._configure_error_file_handler()
+            # Configure file handler
+            self._configure_file_handler()
+
+            # Configure error file handler
+            self._configure_error_file_handler()
 
         # Set up exception catching
         self._configure_exception_catching()
@@ -82,37 +224,74 @@ class LoguruConfig:
 
     def _configure_file_handler(self) -> None:
         """Configure main log file handler."""
-        log_file = self.log_dir / "websocket_server.log"
+        log_file = self._log_file("websocket_server")
 
         logger.add(
             log_file,
             level=settings.log_level,
             serialize=True,  # Automatic JSON serialization
             rotation=settings.log_rotation,
-            retention=settings.log_retention,
-            compression="gz",
+            retention=self._retention("websocket_server"),
+            compression=_compress_in_background,
             backtrace=settings.debug,
-            diagnose=settings.debug,
-            enqueue=True  # Thread-safe logging
+            diagnose=settings.debug
         )
 
     def _configure_error_file_handler(self) -> None:
         """Configure error-only log file handler."""
-        error_log_file = self.log_dir / "errors.log"
+        error_log_file = self._log_file("errors")
 
         logger.add(
             error_log_file,
             level="ERROR",
             serialize=True,  # Automatic JSON serialization
             rotation=settings.log_rotation,
-            retention=settings.log_retention,
-            compression="gz",
+            retention=self._retention("errors"),
+            compression=_compress_in_background,
             backtrace=True,
-            diagnose=True,
-            enqueue=True,
-            filter=lambda record: record["level"].no >= logger.level("ERROR").no
+            diagnose=True
         )
 
+    def _log_file(self, name: str) -> Path:
+        """
+        Get the path of a log file for this process.
+
+        With several workers each process writes and rotates its own file,
+        suffixed with its pid, so the sinks need neither a cross-process
+        queue (enqueue=True) nor coordination over a shared file.
+
+        Args:
+            name: Base name of the log file, without extension
+
+        Returns:
+            Path of the log file
+        """
+        if settings.workers > 1:
+            return self.log_dir / f"{name}.{os.getpid()}.log"
+        return self.log_dir / f"{name}.log"
+
+    def _retention(self, name: str) -> Any:
+        """
+        Get the loguru retention for a log file.
+
+        Per-pid files from workers that have since exited are not named
+        after the current sink, so with several workers retention prunes
+        the files of every pid rather than only this process's.
+
+        Args:
+            name: Base name of the log file, without extension
+
+        Returns:
+            Retention period string, or a callable for per-pid files
+        """
+        if settings.workers <= 1:
+            return settings.log_retention
+        max_age = parse_duration(settings.log_retention)
+        if max_age is None:
+            raise ValueError(f"Cannot parse retention from: '{settings.log_retention}'")
+        pattern = glob.escape(str(self.log_dir / name)) + ".*.log*"
+        return partial(_retain_all_workers, pattern=pattern, max_age=max_age.total_seconds())
+
     def _configure_exception_catching(self) -> None:
         """Configure automatic exception catching."""
         if settings.debug:
@@ -143,13 +322,13 @@ class LoguruConfig:
         # In production, reduce console noise
         if not settings.debug:
             # Only show INFO and above for non-debug modules
-            if record["level"].no < logger.level("INFO").no:
+            level_no = record["level"].no
+            if level_no < INFO_NO:
                 return False
 
             # Filter out some noisy modules in production
-            noisy_modules = ["uvicorn.access", "asyncio"]
-            if any(module in record["name"] for module in noisy_modules):
-                return record["level"].no >= logger.level("WARNING").no
+            if NOISY_MODULES_RE.search(record["name"]):
+                return level_no >= WARNING_NO
 
         return True
 
@@ -160,6 +339,8 @@ class ContextualLogger:
     def __init__(self):
         """Initialize contextual logger."""
         self._context: dict[str, Any] = {}
+        # Logger bound to the current context, rebuilt only when it changes
+        self._bound = logger
 
     def bind_context(self, **kwargs) -> None:
         """
@@ -169,10 +350,12 @@ class ContextualLogger:
             **kwargs: Context data to bind
         """
         self._context.update(kwargs)
+        self._bound = logger.bind(**self._context)
 
     def clear_context(self) -> None:
         """Clear all bound context."""
         self._context.clear()
+        self._bound = logger
 
     def get_logger(self, **extra_context) -> Any:
         """
@@ -184,8 +367,9 @@ class ContextualLogger:
         Returns:
             Logger with bound context
         """
-        combined_context = {**self._context, **extra_context}
-        return logger.bind(**combined_context)
+        if not extra_context:
+            return self._bound
+        return self._bound.bind(**extra_context)
 
     def info(self, message: str, **extra_context) -> None:
         """Log info message with context."""
@@ -270,6 +454,10 @@ class WebSocketLogger:
             user_agent: User agent string
             **extra_data: Additional event data
         """
+        # Skip building the extra dict when no sink would take the record
+        if not _level_enabled(INFO_NO):
+            return
+
         logger.info(
             f"WebSocket {event}: {client_id}",
             extra={
@@ -301,6 +489,10 @@ class WebSocketLogger:
             message_size: Message size in bytes
             **extra_data: Additional message data
         """
+        # Called per frame: skip building the extra dict when DEBUG is off
+        if not _level_enabled(DEBUG_NO):
+            return
+
         logger.debug(
             f"WebSocket message {direction}: {client_id}",
             extra={
@@ -336,21 +528,38 @@ def get_contextual_logger() -> ContextualLogger:
 
 
 # Convenience functions
+@cache
+def get_settings_snapshot() -> dict[str, Any]:
+    """
+    Get the settings included in startup logs, built on first use.
+
+    Built lazily so command-line overrides applied in main.py are included.
+    Call get_settings_snapshot.cache_clear() if settings are changed later.
+    The dict is shared between callers and must not be modified.
+
+    Returns:
+        Dictionary of the server settings worth logging at startup
+    """
+    return {
+        "host": settings.host,
+        "port": settings.port,
+        "workers": settings.workers,
+        "debug": settings.debug,
+        "log_level": settings.log_level,
+        "max_connections": settings.max_connections,
+        "notification_interval": settings.notification_interval,
+        "shutdown_timeout": settings.shutdown_timeout
+    }
+
+
 def log_startup_info() -> None:
     """Log application startup information."""
     logger.info(
         "WebSocket Notification Server starting up",
         extra={
             "startup": {
-                "timestamp": datetime.now(UTC).isoformat(),
-                "settings": {
-                    "host": settings.host,
-                    "port": settings.port,
-                    "workers": settings.workers,
-                    "debug": settings.debug,
-                    "log_level": settings.log_level,
-                    "max_connections": settings.max_connections
-                }
+                "timestamp": iso_now(),
+                "settings": get_settings_snapshot()
             }
         }
     )
@@ -362,7 +571,7 @@ def log_shutdown_info() -> None:
         "WebSocket Notification Server shutting down",
         extra={
             "shutdown": {
-                "timestamp": datetime.now(UTC).isoformat()
+                "timestamp": iso_now()
             }
         }
     )
@@ -79,6 +79,10 @@ class Settings(BaseSettings):
         default="30 days",
         description="Log file retention period"
     )
+    log_to_file: bool = Field(
+        default=True,
+        description="Write JSON log files under logs/ in addition to the console"
+    )
 
     # Development Settings
     debug: bool = Field(
@@ -9,8 +9,11 @@ notification_service = NotificationService(connection_manager)
 shutdown_handler = ShutdownHandler(connection_manager, notification_service)
 multi_worker_coordinator = MultiWorkerShutdownCoordinator()
 
+# The getters are async so FastAPI calls them inline: plain def dependencies
+# are run through the threadpool on every request.
 
-def get_connection_manager() -> ConnectionManager:
+
+async def get_connection_manager() -> ConnectionManager:
     """
     Dependency to get the connection manager instance.
 
@@ -20,7 +23,7 @@ def get_connection_manager() -> ConnectionManager:
     return connection_manager
 
 
-def get_notification_service() -> NotificationService:
+async def get_notification_service() -> NotificationService:
     """
     Dependency to get the notification service instance.
 
@@ -30,7 +33,7 @@ def get_notification_service() -> NotificationService:
     return notification_service
 
 
-def get_shutdown_handler() -> ShutdownHandler:
+async def get_shutdown_handler() -> ShutdownHandler:
     """
     Dependency to get the shutdown handler instance.
 
@@ -40,7 +43,7 @@ def get_shutdown_handler() -> ShutdownHandler:
     return shutdown_handler
 
 
-def get_multi_worker_coordinator() -> MultiWorkerShutdownCoordinator:
+async def get_multi_worker_coordinator() -> MultiWorkerShutdownCoordinator:
     """
     Dependency to get the multi-worker coordinator instance.
 
@@ -1,29 +1,74 @@
 """HTTP endpoint implementations."""
 
-from datetime import UTC, datetime
-
-from fastapi import Depends, HTTPException, status
-from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi import BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse, Response
 from loguru import logger
 
-from ..config import settings
+from ..config import iso_now, settings
 from ..dependencies import (
     get_connection_manager,
     get_notification_service,
     get_shutdown_handler,
 )
 from ..handlers import ShutdownHandler
-from ..models import BroadcastRequest, ConnectionStats
+from ..models import BroadcastRequest
+from ..serialization import ORJSONResponse
 from ..services import ConnectionManager, NotificationService
 
+# Prometheus text exposition, formatted per scrape with bytes %-formatting.
+# %a renders the uptime float exactly like str() would.
+PROMETHEUS_METRICS_TEMPLATE = b"""# HELP websocket_active_connections Number of active WebSocket connections
+# TYPE websocket_active_connections gauge
+websocket_active_connections %d
+
+# HELP websocket_total_connections Total number of connections since server start
+# TYPE websocket_total_connections counter
+websocket_total_connections %d
+
+# HELP websocket_notifications_sent Total number of notifications sent
+# TYPE websocket_notifications_sent counter
+websocket_notifications_sent %d
+
+# HELP websocket_server_uptime_seconds Server uptime in seconds
+# TYPE websocket_server_uptime_seconds gauge
+websocket_server_uptime_seconds %a
+
+# HELP websocket_notification_service_running Notification service running status (1=running, 0=stopped)
+# TYPE websocket_notification_service_running gauge
+websocket_notification_service_running %d
+
+# HELP websocket_max_connections Maximum allowed connections
+# TYPE websocket_max_connections gauge
+websocket_max_connections %d
+
+# HELP websocket_workers Number of worker processes
+# TYPE websocket_workers gauge
+websocket_workers %d
+"""
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Steady-state /health body, pre-encoded so frequent liveness probes skip the
+# JSON encoder. Settings are filled per call since main.py may override them.
+HEALTHY_BODY_TEMPLATE = (
+    b'{"status":"healthy",'
+    b'"message":"WebSocket Notification Server is running",'
+    b'"timestamp":"%s",'
+    b'"connections":{"active":%d,"total":%d,"max_allowed":%d},'
+    b'"server_info":{"version":"0.1.0","workers":%d,"notification_interval":%d}}'
+)
+
 
 async def health_endpoint(
     connection_manager: ConnectionManager = Depends(get_connection_manager),
     shutdown_handler: ShutdownHandler = Depends(get_shutdown_handler)
-) -> JSONResponse:
+) -> Response:
     """
     Health check endpoint for monitoring systems.
 
+    The common healthy response is rendered from HEALTHY_BODY_TEMPLATE;
+    only the warning, shutdown and failure cases go through the encoder.
+
     Args:
         connection_manager: ConnectionManager dependency
         shutdown_handler: ShutdownHandler dependency
@@ -34,12 +79,12 @@ async def health_endpoint(
     try:
         # Check if shutdown is in progress
         if shutdown_handler.is_shutdown_requested():
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 content={
                     "status": "shutting_down",
                     "message": "Server is shutting down",
-                    "timestamp": datetime.now(UTC).isoformat(),
+                    "timestamp": iso_now(),
                     "shutdown_info": shutdown_handler.get_shutdown_info()
                 }
             )
@@ -49,16 +94,25 @@ async def health_endpoint(
         total_connections = await connection_manager.get_total_connections()
 
         # Determine health status
-        health_status = "healthy"
-        if active_connections >= settings.max_connections * 0.9:  # 90% capacity
-            health_status = "warning"
+        if active_connections < settings.max_connections * 0.9:  # 90% capacity
+            return Response(
+                content=HEALTHY_BODY_TEMPLATE % (
+                    iso_now().encode(),
+                    active_connections,
+                    total_connections,
+                    settings.max_connections,
+                    settings.workers,
+                    settings.notification_interval,
+                ),
+                media_type="application/json"
+            )
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
-                "status": health_status,
+                "status": "warning",
                 "message": "WebSocket Notification Server is running",
-                "timestamp": datetime.now(UTC).isoformat(),
+                "timestamp": iso_now(),
                 "connections": {
                     "active": active_connections,
                     "total": total_connections,
@@ -74,31 +128,38 @@ async def health_endpoint(
 
     except Exception as e:
         logger.error(f"Health check failed: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={
                 "status": "unhealthy",
                 "message": f"Health check failed: {str(e)}",
-                "timestamp": datetime.now(UTC).isoformat()
+                "timestamp": iso_now()
             }
         )
 
 
 async def notify_endpoint(
     request: BroadcastRequest,
+    background_tasks: BackgroundTasks,
+    connection_manager: ConnectionManager = Depends(get_connection_manager),
     notification_service: NotificationService = Depends(get_notification_service),
     shutdown_handler: ShutdownHandler = Depends(get_shutdown_handler)
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Endpoint for broadcasting on-demand notifications.
 
+    The broadcast runs as a background task after the response is sent,
+    so the caller does not wait for the fan-out to every client.
+
     Args:
         request: Broadcast request data
+        background_tasks: Tasks run after the response is sent
+        connection_manager: ConnectionManager dependency
         notification_service: NotificationService dependency
         shutdown_handler: ShutdownHandler dependency
 
     Returns:
-        JSON response with broadcast results
+        JSON response with the number of clients the notification is sent to
     """
     # Check if shutdown is in progress
     if shutdown_handler.is_shutdown_requested():
@@ -116,25 +177,27 @@ async def notify_endpoint(
             }
         )
 
-        # Send the notification
-        recipients = await notification_service.send_custom_notification(
+        # Broadcast once the response is out; clients connected now receive it
+        background_tasks.add_task(
+            notification_service.send_custom_notification,
             message=request.message,
             notification_type=request.type,
             data=request.data
         )
+        recipients = await connection_manager.get_connection_count()
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content={
                 "status": "success",
-                "message": "Notification sent successfully",
+                "message": "Notification queued for delivery",
                 "recipients": recipients,
                 "notification": {
                     "message": request.message,
                     "type": request.type,
                     "data": request.data
                 },
-                "timestamp": datetime.now(UTC).isoformat()
+                "timestamp": iso_now()
             }
         )
 
@@ -149,7 +212,7 @@ async def notify_endpoint(
 async def metrics_endpoint(
     connection_manager: ConnectionManager = Depends(get_connection_manager),
     notification_service: NotificationService = Depends(get_notification_service)
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Metrics endpoint for monitoring and statistics.
 
@@ -164,17 +227,15 @@ async def metrics_endpoint(
         # Get service statistics
         service_stats = await notification_service.get_service_stats()
 
-        # Create connection stats model
-        connection_stats = ConnectionStats(
-            active_connections=service_stats["active_connections"],
-            total_connections=service_stats["total_connections"],
-            messages_sent=service_stats["notifications_sent"],
-            uptime_seconds=service_stats["uptime_seconds"]
-        )
-
-        # Additional metrics
+        # Additional metrics; "connections" has the ConnectionStats shape but
+        # is built as a plain dict, since these values need no validation
         metrics = {
-            "connections": connection_stats.model_dump(),
+            "connections": {
+                "active_connections": service_stats["active_connections"],
+                "total_connections": service_stats["total_connections"],
+                "messages_sent": service_stats["notifications_sent"],
+                "uptime_seconds": service_stats["uptime_seconds"]
+            },
             "notification_service": {
                 "is_running": service_stats["is_running"],
                 "notification_interval": service_stats["notification_interval"],
@@ -186,10 +247,10 @@ async def metrics_endpoint(
                 "max_connections": settings.max_connections,
                 "debug_mode": settings.debug
             },
-            "timestamp": datetime.now(UTC).isoformat()
+            "timestamp": iso_now()
         }
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content=metrics
         )
@@ -220,39 +281,21 @@ async def prometheus_metrics_endpoint(
         # Get service statistics
         service_stats = await notification_service.get_service_stats()
 
-        # Generate Prometheus metrics format
-        metrics_text = f"""# HELP websocket_active_connections Number of active WebSocket connections
-# TYPE websocket_active_connections gauge
-websocket_active_connections {service_stats["active_connections"]}
-
-# HELP websocket_total_connections Total number of connections since server start
-# TYPE websocket_total_connections counter
-websocket_total_connections {service_stats["total_connections"]}
-
-# HELP websocket_notifications_sent Total number of notifications sent
-# TYPE websocket_notifications_sent counter
-websocket_notifications_sent {service_stats["notifications_sent"]}
-
-# HELP websocket_server_uptime_seconds Server uptime in seconds
-# TYPE websocket_server_uptime_seconds gauge
-websocket_server_uptime_seconds {service_stats["uptime_seconds"]}
-
-# HELP websocket_notification_service_running Notification service running status (1=running, 0=stopped)
-# TYPE websocket_notification_service_running gauge
-websocket_notification_service_running {1 if service_stats["is_running"] else 0}
-
-# HELP websocket_max_connections Maximum allowed connections
-# TYPE websocket_max_connections gauge
-websocket_max_connections {settings.max_connections}
-
-# HELP websocket_workers Number of worker processes
-# TYPE websocket_workers gauge
-websocket_workers {settings.workers}
-"""
+        # Fill the pre-built exposition template; bytes formatting skips the
+        # str -> bytes encode the response would otherwise do
+        metrics_body = PROMETHEUS_METRICS_TEMPLATE % (
+            service_stats["active_connections"],
+            service_stats["total_connections"],
+            service_stats["notifications_sent"],
+            service_stats["uptime_seconds"],
+            1 if service_stats["is_running"] else 0,
+            settings.max_connections,
+            settings.workers,
+        )
 
         return PlainTextResponse(
-            content=metrics_text,
-            media_type="text/plain"
+            content=metrics_body,
+            media_type=PROMETHEUS_CONTENT_TYPE
         )
 
     except Exception as e:
@@ -267,7 +310,7 @@ async def status_endpoint(
     connection_manager: ConnectionManager = Depends(get_connection_manager),
     notification_service: NotificationService = Depends(get_notification_service),
     shutdown_handler: ShutdownHandler = Depends(get_shutdown_handler)
-) -> JSONResponse:
+) -> ORJSONResponse:
     """
     Detailed status endpoint with comprehensive server information.
 
@@ -293,17 +336,19 @@ async def status_endpoint(
                 "version": "0.1.0",
                 "uptime_seconds": service_stats["uptime_seconds"],
                 "start_time": service_stats["start_time"],
-                "current_time": datetime.now(UTC).isoformat()
+                "current_time": iso_now()
             },
             "connections": {
                 "active": service_stats["active_connections"],
                 "total": service_stats["total_connections"],
                 "max_allowed": settings.max_connections,
+                # Datetimes are left to orjson, which writes the same ISO 8601
+                # text as isoformat() without a Python call per timestamp
                 "details": [
                     {
                         "client_id": info.client_id,
-                        "connected_at": info.connected_at.isoformat(),
-                        "last_ping": info.last_ping.isoformat() if info.last_ping else None,
+                        "connected_at": info.connected_at,
+                        "last_ping": info.last_ping,
                         "user_agent": info.user_agent
                     }
                     for info in all_connections.values()
@@ -324,7 +369,7 @@ async def status_endpoint(
             }
         }
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_200_OK,
             content=status_info
         )
@@ -1,21 +1,41 @@
 """WebSocket endpoint implementation."""
 
 import asyncio
-import json
+import itertools
+import secrets
+from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime
-from uuid import uuid4
+from typing import Any
 
+import orjson
 from fastapi import Depends, WebSocket, WebSocketDisconnect
 from loguru import logger
 
+from ..config import WebSocketLogger, iso_now
 from ..dependencies import get_connection_manager, get_shutdown_handler
 from ..handlers import ShutdownHandler
 from ..services import ConnectionManager
 
+# Generated client IDs: a random per-process tag plus a connection counter,
+# unique within the process and telling workers apart in shared logs
+_CLIENT_TAG = secrets.token_hex(2)
+_client_counter = itertools.count()
+
+# ?compression= value that opts a client into binary "zlib" broadcast frames
+ZLIB_COMPRESSION = "zlib"
+
+# Pong reply around its timestamp, so answering a ping needs no JSON encoding
+_PONG_PREFIX = b'{"type":"pong","timestamp":"'
+_PONG_SUFFIX = b'"}'
+
+# Handler for one client message type: (websocket, client_id, data, manager)
+MessageHandler = Callable[[WebSocket, str, dict[str, Any], ConnectionManager], Awaitable[None]]
+
 
 async def websocket_endpoint(
     websocket: WebSocket,
     client_id: str | None = None,
+    compression: str | None = None,
     connection_manager: ConnectionManager = Depends(get_connection_manager),
     shutdown_handler: ShutdownHandler = Depends(get_shutdown_handler)
 ):
@@ -25,12 +45,13 @@ async def websocket_endpoint(
     Args:
         websocket: WebSocket connection instance
         client_id: Optional client identifier (generated if not provided)
+        compression: "zlib" to receive broadcasts as compressed binary frames
         connection_manager: ConnectionManager dependency
         shutdown_handler: ShutdownHandler dependency
     """
     # Generate client ID if not provided
     if not client_id:
-        client_id = f"client_{uuid4().hex[:8]}"
+        client_id = f"client_{_CLIENT_TAG}{next(_client_counter):06x}"
 
     logger.info(
         f"WebSocket connection attempt from client {client_id}",
@@ -52,17 +73,19 @@ async def websocket_endpoint(
 
     try:
         # Connect the client
-        await connection_manager.connect(websocket, client_id)
+        await connection_manager.connect(
+            websocket, client_id, compress=compression == ZLIB_COMPRESSION
+        )
 
         # Send welcome message
         welcome_message = {
             "type": "welcome",
             "message": "Connected to WebSocket Notification Server",
             "client_id": client_id,
-            "server_time": datetime.now(UTC).isoformat(),
+            "server_time": iso_now(),
             "notification_interval": 10  # From settings
         }
-        await websocket.send_json(welcome_message)
+        await connection_manager.send(client_id, welcome_message)
 
         # Handle incoming messages
         await handle_websocket_messages(websocket, client_id, connection_manager, shutdown_handler)
@@ -125,24 +148,27 @@ async def handle_websocket_messages(
             try:
                 # Use asyncio.wait_for to add timeout
                 message = await asyncio.wait_for(
-                    websocket.receive_text(),
+                    receive_frame(websocket),
                     timeout=30.0  # 30 second timeout
                 )
             except TimeoutError:
-                # Send ping to check if connection is alive
-                try:
-                    await websocket.send_json({
-                        "type": "ping",
-                        "timestamp": datetime.now(UTC).isoformat()
-                    })
-                    continue
-                except Exception:
-                    # Connection is dead
-                    logger.info(
-                        f"Client {client_id} connection timeout - no response to ping",
-                        extra={"client_id": client_id}
-                    )
-                    break
+                # Send ping to check if connection is alive. Wait for the
+                # write: a failed one makes the writer drop the client, and
+                # the dead connection is noticed now, not a timeout later.
+                if await connection_manager.send(client_id, {
+                    "type": "ping",
+                    "timestamp": iso_now()
+                }):
+                    await connection_manager.flush(client_id)
+                    if await connection_manager.get_connection_info(client_id):
+                        continue
+
+                # Connection is dead
+                logger.info(
+                    f"Client {client_id} connection timeout - no response to ping",
+                    extra={"client_id": client_id}
+                )
+                break
 
             # Process the message
             await process_client_message(websocket, client_id, message, connection_manager)
@@ -159,10 +185,37 @@ async def handle_websocket_messages(
         )
 
 
+async def receive_frame(websocket: WebSocket) -> str | bytes:
+    """
+    Receive the next text or binary frame from a client.
+
+    Binary frames are returned as bytes and handed to the JSON parser
+    directly, skipping the UTF-8 decode to str.
+
+    Args:
+        websocket: WebSocket connection instance
+
+    Returns:
+        Frame payload as str (text frame) or bytes (binary frame)
+
+    Raises:
+        WebSocketDisconnect: If the client disconnected
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+
+    text: str | None = message.get("text")
+    if text is not None:
+        return text
+    data: bytes = message["bytes"]
+    return data
+
+
 async def process_client_message(
     websocket: WebSocket,
     client_id: str,
-    message: str,
+    message: str | bytes,
     connection_manager: ConnectionManager
 ):
     """
@@ -171,90 +224,140 @@ async def process_client_message(
     Args:
         websocket: WebSocket connection instance
         client_id: Client identifier
-        message: Raw message string from client
+        message: Raw message from client (str or UTF-8 encoded bytes)
         connection_manager: ConnectionManager instance
     """
     try:
         # Parse JSON message
         try:
-            data = json.loads(message)
-        except json.JSONDecodeError:
+            data = orjson.loads(message)
+        except ValueError:  # JSONDecodeError or invalid UTF-8 in a binary frame
             await send_error_response(
-                websocket,
-                "Invalid JSON format",
-                client_id
+                connection_manager,
+                client_id,
+                "Invalid JSON format"
             )
             return
 
         message_type = data.get("type", "unknown")
 
-        logger.debug(
-            f"Received message from client {client_id}",
-            extra={
-                "client_id": client_id,
-                "message_type": message_type,
-                "message_size": len(message)
-            }
-        )
-
-        # Handle different message types
-        if message_type == "pong":
-            # Update last ping time
-            connection_info = await connection_manager.get_connection_info(client_id)
-            if connection_info:
-                connection_info.last_ping = datetime.now(UTC)
+        # Gated on DEBUG, so the per-frame log costs nothing in production
+        WebSocketLogger.log_message(client_id, "received", message_type, len(message))
 
-            logger.debug(
-                f"Received pong from client {client_id}",
-                extra={"client_id": client_id}
-            )
-
-        elif message_type == "ping":
-            # Respond with pong
-            await websocket.send_json({
-                "type": "pong",
-                "timestamp": datetime.now(UTC).isoformat()
-            })
-
-        elif message_type == "status_request":
-            # Send connection status
-            stats = await get_connection_stats(connection_manager)
-            await websocket.send_json({
-                "type": "status_response",
-                "data": stats,
-                "timestamp": datetime.now(UTC).isoformat()
-            })
-
-        else:
-            # Unknown message type
+        handler = MESSAGE_HANDLERS.get(message_type)
+        if handler is None:
             await send_error_response(
-                websocket,
-                f"Unknown message type: {message_type}",
-                client_id
+                connection_manager,
+                client_id,
+                f"Unknown message type: {message_type}"
             )
+            return
+
+        await handler(websocket, client_id, data, connection_manager)
 
     except Exception as e:
         logger.error(
             f"Error processing message from client {client_id}: {e}",
             extra={"client_id": client_id, "error": str(e), "message": message}
         )
-        await send_error_response(websocket, "Internal server error", client_id)
+        await send_error_response(connection_manager, client_id, "Internal server error")
 
 
-async def send_error_response(websocket: WebSocket, error_message: str, client_id: str):
+async def handle_pong(
+    websocket: WebSocket,
+    client_id: str,
+    data: dict[str, Any],
+    connection_manager: ConnectionManager
+) -> None:
     """
-    Send an error response to the client.
+    Record a client's reply to a server ping.
+
+    Args:
+        websocket: WebSocket connection instance
+        client_id: Client identifier
+        data: Parsed message
+        connection_manager: ConnectionManager instance
+    """
+    # Update last ping time
+    connection_info = await connection_manager.get_connection_info(client_id)
+    if connection_info:
+        connection_info.last_ping = datetime.now(UTC)
+
+    logger.debug(
+        f"Received pong from client {client_id}",
+        extra={"client_id": client_id}
+    )
+
+
+async def handle_ping(
+    websocket: WebSocket,
+    client_id: str,
+    data: dict[str, Any],
+    connection_manager: ConnectionManager
+) -> None:
+    """
+    Answer a client ping with a pong.
+
+    Args:
+        websocket: WebSocket connection instance
+        client_id: Client identifier
+        data: Parsed message
+        connection_manager: ConnectionManager instance
+    """
+    await connection_manager.send_encoded(
+        client_id, _PONG_PREFIX + iso_now().encode() + _PONG_SUFFIX
+    )
+
+
+async def handle_status_request(
+    websocket: WebSocket,
+    client_id: str,
+    data: dict[str, Any],
+    connection_manager: ConnectionManager
+) -> None:
+    """
+    Send the client the current connection statistics.
 
     Args:
         websocket: WebSocket connection instance
+        client_id: Client identifier
+        data: Parsed message
+        connection_manager: ConnectionManager instance
+    """
+    stats = await get_connection_stats(connection_manager)
+    await connection_manager.send(client_id, {
+        "type": "status_response",
+        "data": stats,
+        "timestamp": iso_now()
+    })
+
+
+# Client message type -> handler, looked up once per received message
+MESSAGE_HANDLERS: dict[str, MessageHandler] = {
+    "pong": handle_pong,
+    "ping": handle_ping,
+    "status_request": handle_status_request,
+}
+
+
+async def send_error_response(
+    connection_manager: ConnectionManager,
+    client_id: str,
+    error_message: str
+):
+    """
+    Send an error response to the client.
+
+    Args:
+        connection_manager: ConnectionManager instance
+        client_id: Client to send the error to
         error_message: Error message to send
-        client_id: Client identifier for logging
     """
     try:
-        await websocket.send_json({
+        await connection_manager.send(client_id, {
             "type": "error",
             "message": error_message,
-            "timestamp": datetime.now(UTC).isoformat()
+            "timestamp": iso_now()
         })
     except Exception as e:
         logger.error(
@@ -276,5 +379,5 @@ async def get_connection_stats(connection_manager: ConnectionManager) -> dict:
     return {
         "active_connections": await connection_manager.get_connection_count(),
         "total_connections": await connection_manager.get_total_connections(),
-        "server_time": datetime.now(UTC).isoformat()
+        "server_time": iso_now()
     }
@@ -6,10 +6,11 @@ from typing import Any
 from uuid import uuid4
 
 from fastapi import HTTPException, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
 from loguru import logger
 
-from ..config import settings
+from ..config import iso_now, settings
+from ..serialization import ORJSONResponse, send_json
+from ..services import ConnectionManager
 
 
 class ErrorCategories:
@@ -75,15 +76,20 @@ class ErrorHandler:
     async def handle_websocket_error(
         websocket: WebSocket,
         error: Exception,
-        client_id: str | None = None
+        client_id: str | None = None,
+        connection_manager: ConnectionManager | None = None
     ) -> None:
         """
         Handle WebSocket-specific errors with appropriate cleanup.
 
+        For a client registered with connection_manager the error message goes
+        through its send queue, so it never interleaves with the writer task.
+
         Args:
             websocket: WebSocket connection instance
             error: Exception that occurred
             client_id: Optional client identifier
+            connection_manager: Manager the client may be registered with
         """
         error_id = str(uuid4())
 
@@ -118,13 +124,23 @@ class ErrorHandler:
         # Try to send error message to client before closing
         try:
             if not isinstance(error, WebSocketDisconnect):
-                await websocket.send_json({
+                error_response = {
                     "type": "error",
                     "error_id": error_id,
                     "message": error_message,
                     "code": close_code,
-                    "timestamp": datetime.now(UTC).isoformat()
-                })
+                    "timestamp": iso_now()
+                }
+                if (
+                    connection_manager is not None
+                    and client_id is not None
+                    and await connection_manager.send(client_id, error_response)
+                ):
+                    # Let the writer task deliver it before the socket closes
+                    await connection_manager.flush(client_id)
+                else:
+                    # Not registered, so no writer task owns the socket yet
+                    await send_json(websocket, error_response)
         except Exception as send_error:
             logger.debug(f"Could not send error message to client {client_id}: {send_error}")
 
@@ -210,7 +226,7 @@ class ErrorHandler:
         return error_id
 
     @staticmethod
-    async def handle_http_error(request: Request, error: Exception) -> JSONResponse:
+    async def handle_http_error(request: Request, error: Exception) -> ORJSONResponse:
         """
         Handle HTTP endpoint errors.
 
@@ -259,7 +275,7 @@ class ErrorHandler:
                 "id": error_id,
                 "message": error_message,
                 "category": category,
-                "timestamp": datetime.now(UTC).isoformat()
+                "timestamp": iso_now()
             }
         }
 
@@ -270,7 +286,7 @@ class ErrorHandler:
                 "traceback": traceback.format_exc()
             }
 
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status_code,
             content=error_response
         )
@@ -292,7 +308,7 @@ class ErrorHandler:
         """
         context = {
             "operation": operation,
-            "timestamp": datetime.now(UTC).isoformat(),
+            "timestamp": iso_now(),
             "server_info": {
                 "debug_mode": settings.debug,
                 "log_level": settings.log_level
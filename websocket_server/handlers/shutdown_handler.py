@@ -143,6 +143,8 @@ class ShutdownHandler:
                 return
 
             remaining_time = (timeout_time - datetime.now(UTC)).total_seconds()
+            if remaining_time <= 0:
+                break
 
             logger.info(
                 f"Waiting for {active_connections} connections to close "
@@ -158,7 +160,15 @@ class ShutdownHandler:
             if stale_cleaned > 0:
                 logger.info(f"Cleaned up {stale_cleaned} stale connections during shutdown")
 
-            await asyncio.sleep(check_interval)
+            # Wake as soon as the last connection closes, or re-check
+            # (and clean up stale connections) every check_interval
+            try:
+                await asyncio.wait_for(
+                    self.connection_manager.wait_for_no_connections(),
+                    timeout=min(check_interval, remaining_time)
+                )
+            except TimeoutError:
+                pass
 
         # Timeout reached
         final_connections = await self.connection_manager.get_connection_count()
@@ -0,0 +1,92 @@
+"""JSON serialization for HTTP responses and WebSocket frames, backed by orjson."""
+
+import zlib
+from typing import Any
+
+import orjson
+from fastapi import WebSocket
+from fastapi.responses import JSONResponse
+
+# Stringify int/enum dict keys like the stdlib encoder instead of raising
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Leading byte of a binary frame whose body is raw-deflate compressed JSON
+ZLIB_FRAME_MARKER = b"\x01"
+# Pristine raw-deflate (RFC 7692 style) compressor, copied for each frame.
+# Level 1 gets most of the size win on repetitive JSON for little CPU.
+_DEFLATE = zlib.compressobj(level=1, wbits=-15)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize content to UTF-8 encoded JSON.
+
+    Args:
+        content: JSON-compatible value to serialize
+
+    Returns:
+        Encoded JSON document
+    """
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def compress(payload: bytes) -> bytes:
+    """
+    Compress encoded JSON into the body of a binary "zlib" frame.
+
+    Args:
+        payload: UTF-8 encoded JSON message
+
+    Returns:
+        ZLIB_FRAME_MARKER followed by the raw-deflate compressed payload
+    """
+    compressor = _DEFLATE.copy()
+    return ZLIB_FRAME_MARKER + compressor.compress(payload) + compressor.flush()
+
+
+def decompress(frame: bytes) -> bytes:
+    """
+    Recover the encoded JSON from a binary "zlib" frame.
+
+    Args:
+        frame: Frame produced by compress()
+
+    Returns:
+        UTF-8 encoded JSON message
+
+    Raises:
+        ValueError: If the frame does not start with ZLIB_FRAME_MARKER
+    """
+    if frame[:1] != ZLIB_FRAME_MARKER:
+        raise ValueError("Not a zlib frame")
+    return zlib.decompress(frame[1:], wbits=-15)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse that renders its content with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        """
+        Render the response body.
+
+        Args:
+            content: JSON-compatible response content
+
+        Returns:
+            Encoded JSON body
+        """
+        return dumps(content)
+
+
+async def send_json(websocket: WebSocket, message: Any) -> None:
+    """
+    Send a message to a client as a JSON text frame.
+
+    Drop-in replacement for WebSocket.send_json() that encodes with orjson.
+    Frames stay text frames, which browser clients expect for JSON.
+
+    Args:
+        websocket: WebSocket connection instance
+        message: JSON-compatible message to send
+    """
+    await websocket.send_text(dumps(message).decode())
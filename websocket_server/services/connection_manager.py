@@ -2,12 +2,66 @@
 
 import asyncio
 from datetime import UTC, datetime, timedelta
+from typing import Any
 
 from fastapi import WebSocket, WebSocketDisconnect
 from loguru import logger
 
-from ..config import settings
+from ..config import iso_now, settings
 from ..models import ConnectionInfo
+from ..serialization import compress, dumps
+
+# Clients queued to before the broadcast yields to the event loop
+BROADCAST_BATCH_SIZE = 64
+# Frames buffered per client; a client that falls this far behind is dropped.
+# Sized to absorb a burst of back-to-back broadcasts before writers catch up.
+SEND_QUEUE_SIZE = 256
+# Most queued frames coalesced into one batch frame by a client's writer
+MAX_BATCH_FRAMES = 32
+# Seconds shutdown waits for queued frames (e.g. the shutdown notice) to go out
+SHUTDOWN_FLUSH_TIMEOUT = 5.0
+
+
+class _Frame:
+    """One outgoing message, shared by every client queue it is put on."""
+
+    __slots__ = ("text", "_compressed")
+
+    def __init__(self, text: str):
+        """
+        Initialize the frame.
+
+        Args:
+            text: JSON text of the message
+        """
+        self.text = text
+        self._compressed: bytes | None = None
+
+    def compressed(self) -> bytes:
+        """
+        Get the binary "zlib" form of the frame, compressing it on first use.
+
+        Returns:
+            Compressed frame, computed once however many clients it goes to
+        """
+        if self._compressed is None:
+            self._compressed = compress(self.text.encode())
+        return self._compressed
+
+
+def _batch_frame(frames: list[_Frame]) -> _Frame:
+    """
+    Wrap already serialized messages in a single batch message.
+
+    Args:
+        frames: Queued frames, in send order
+
+    Returns:
+        Frame holding {"type": "batch", "items": [...]}
+    """
+    return _Frame(
+        '{"type":"batch","items":[' + ",".join(frame.text for frame in frames) + "]}"
+    )
 
 
 class ConnectionManager:
@@ -19,14 +73,26 @@ class ConnectionManager:
         self._connection_info: dict[str, ConnectionInfo] = {}
         self._lock = asyncio.Lock()
         self._total_connections = 0
-
-    async def connect(self, websocket: WebSocket, client_id: str) -> None:
+        # Outgoing frames per client, written by one writer task per client
+        self._send_queues: dict[str, asyncio.Queue[_Frame]] = {}
+        self._writers: dict[str, asyncio.Task[None]] = {}
+        # Set while there are no connections, so waiters need not poll
+        self._no_connections = asyncio.Event()
+        self._no_connections.set()
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        client_id: str,
+        compress: bool = False
+    ) -> None:
         """
         Accept and register a new WebSocket connection.
 
         Args:
             websocket: The WebSocket connection instance
             client_id: Unique identifier for the client
+            compress: Send broadcasts to this client as binary "zlib" frames
 
         Raises:
             ValueError: If client_id is already connected
@@ -54,12 +120,20 @@ class ConnectionManager:
                 connected_at=datetime.now(UTC),
                 user_agent=websocket.headers.get("user-agent")
             )
+            queue: asyncio.Queue[_Frame] = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+            self._send_queues[client_id] = queue
+            self._writers[client_id] = asyncio.create_task(
+                self._write_loop(client_id, websocket, queue, compress),
+                name=f"ws-writer-{client_id}"
+            )
             self._total_connections += 1
+            self._no_connections.clear()
 
             logger.info(
                 f"Client {client_id} connected",
                 extra={
                     "client_id": client_id,
+                    "compress": compress,
                     "active_connections": len(self._connections),
                     "total_connections": self._total_connections
                 }
@@ -75,8 +149,9 @@ class ConnectionManager:
         async with self._lock:
             if client_id in self._connections:
                 # Remove from tracking
-                del self._connections[client_id]
-                connection_info = self._connection_info.pop(client_id, None)
+                connection_info = self._forget(client_id)
+                if not self._connections:
+                    self._no_connections.set()
 
                 # Calculate connection duration
                 duration = None
@@ -102,54 +177,210 @@ class ConnectionManager:
             message: Dictionary message to broadcast
 
         Returns:
-            Number of clients that successfully received the message
+            Number of clients the message was queued for
         """
         if not self._connections:
             logger.debug("No active connections for broadcast")
             return 0
 
-        successful_sends = 0
+        # Encode once for every client instead of once per send
+        return await self.broadcast_encoded(dumps(message), message.get("type", "unknown"))
+
+    async def broadcast_encoded(self, payload: bytes, message_type: str = "unknown") -> int:
+        """
+        Broadcast an already serialized JSON message to all connected clients.
+
+        The frame is put on each client's send queue and written by that
+        client's writer task, so this returns without waiting on any socket.
+        Clients whose queue is full are too slow to keep up and are dropped.
+        All clients share one frame, so clients that asked for compression
+        cost a single compression per broadcast between them.
+
+        Args:
+            payload: UTF-8 encoded JSON message
+            message_type: Message type, used for logging only
+
+        Returns:
+            Number of clients the message was queued for
+        """
+        if not self._connections:
+            logger.debug("No active connections for broadcast")
+            return 0
+
+        queued = 0
         failed_clients: set[str] = set()
+        # Every client gets the same frame, decoded a single time
+        frame = _Frame(payload.decode())
 
-        # Create a snapshot of connections to avoid lock contention
+        # Create a snapshot of the queues to avoid lock contention
         async with self._lock:
-            connections_snapshot = dict(self._connections)
+            queues_snapshot = list(self._send_queues.items())
+
+        # Yield to the event loop between batches so large fan-outs don't stall it
+        for start in range(0, len(queues_snapshot), BROADCAST_BATCH_SIZE):
+            for client_id, queue in queues_snapshot[start:start + BROADCAST_BATCH_SIZE]:
+                try:
+                    queue.put_nowait(frame)
+                    queued += 1
+                except asyncio.QueueFull:
+                    logger.warning(
+                        f"Send queue full for client {client_id}, dropping slow client",
+                        extra={"client_id": client_id, "queue_size": SEND_QUEUE_SIZE}
+                    )
+                    failed_clients.add(client_id)
+
+            await asyncio.sleep(0)
 
-        # Send messages without holding the lock
-        for client_id, websocket in connections_snapshot.items():
-            try:
-                await websocket.send_json(message)
-                successful_sends += 1
+        # Clean up failed connections
+        if failed_clients:
+            await self._cleanup_failed_connections(failed_clients)
 
-                # Update last ping time
-                async with self._lock:
-                    if client_id in self._connection_info:
-                        self._connection_info[client_id].last_ping = datetime.now(UTC)
+        logger.debug(
+            f"Broadcast queued: {queued} clients, {len(failed_clients)} dropped",
+            extra={
+                "queued_sends": queued,
+                "failed_sends": len(failed_clients),
+                "message_type": message_type
+            }
+        )
+
+        return queued
+
+    async def send(self, client_id: str, message: dict[str, Any]) -> bool:
+        """
+        Send a message to a single client.
+
+        Args:
+            client_id: Client identifier
+            message: Dictionary message to send
 
+        Returns:
+            True if the message was queued for the client
+        """
+        return await self.send_encoded(client_id, dumps(message))
+
+    async def send_encoded(self, client_id: str, payload: bytes) -> bool:
+        """
+        Send an already serialized JSON message to a single client.
+
+        The frame goes through the client's send queue, so it is written in
+        order with broadcasts and coalesced with anything already pending.
+        A client whose queue is full is dropped, as in broadcast_encoded().
+
+        Args:
+            client_id: Client identifier
+            payload: UTF-8 encoded JSON message
+
+        Returns:
+            True if the message was queued for the client
+        """
+        queue = self._send_queues.get(client_id)
+        if queue is None:
+            logger.debug(f"Attempted to send to unknown client {client_id}")
+            return False
+
+        try:
+            queue.put_nowait(_Frame(payload.decode()))
+        except asyncio.QueueFull:
+            logger.warning(
+                f"Send queue full for client {client_id}, dropping slow client",
+                extra={"client_id": client_id, "queue_size": SEND_QUEUE_SIZE}
+            )
+            await self._cleanup_failed_connections({client_id})
+            return False
+
+        return True
+
+    async def flush(self, client_id: str | None = None) -> None:
+        """
+        Wait until queued frames have been written to their clients.
+
+        Args:
+            client_id: Only wait for this client's frames; all clients if None
+        """
+        async with self._lock:
+            if client_id is None:
+                queues = list(self._send_queues.values())
+            else:
+                queue = self._send_queues.get(client_id)
+                queues = [queue] if queue is not None else []
+
+        await asyncio.gather(*(queue.join() for queue in queues))
+
+    async def _write_loop(
+        self,
+        client_id: str,
+        websocket: WebSocket,
+        queue: asyncio.Queue[_Frame],
+        compress: bool = False
+    ) -> None:
+        """
+        Write queued frames to one client until a send fails or it is removed.
+
+        Frames that pile up while a send is in flight are coalesced into a
+        single batch frame, so a busy client costs one write per batch
+        instead of one per message.
+
+        Args:
+            client_id: Client identifier
+            websocket: The client's WebSocket connection
+            queue: The client's send queue
+            compress: Send binary "zlib" frames instead of JSON text
+        """
+        while True:
+            frames = [await queue.get()]
+            while len(frames) < MAX_BATCH_FRAMES and not queue.empty():
+                frames.append(queue.get_nowait())
+
+            frame = frames[0] if len(frames) == 1 else _batch_frame(frames)
+            try:
+                if compress:
+                    await websocket.send_bytes(frame.compressed())
+                else:
+                    await websocket.send_text(frame.text)
             except WebSocketDisconnect:
                 logger.info(f"Client {client_id} disconnected during broadcast")
-                failed_clients.add(client_id)
+                await self._cleanup_failed_connections({client_id})
+                return
             except Exception as e:
                 logger.error(
                     f"Failed to send message to client {client_id}: {e}",
                     extra={"client_id": client_id, "error": str(e)}
                 )
-                failed_clients.add(client_id)
+                await self._cleanup_failed_connections({client_id})
+                return
+            finally:
+                for _ in frames:
+                    queue.task_done()
+
+            # Update last ping time
+            connection_info = self._connection_info.get(client_id)
+            if connection_info:
+                connection_info.last_ping = datetime.now(UTC)
+
+    def _forget(self, client_id: str) -> ConnectionInfo | None:
+        """
+        Drop a client from tracking and stop its writer. Caller holds the lock.
 
-        # Clean up failed connections
-        if failed_clients:
-            await self._cleanup_failed_connections(failed_clients)
+        Args:
+            client_id: Client identifier
 
-        logger.debug(
-            f"Broadcast completed: {successful_sends} successful, {len(failed_clients)} failed",
-            extra={
-                "successful_sends": successful_sends,
-                "failed_sends": len(failed_clients),
-                "message_type": message.get("type", "unknown")
-            }
-        )
+        Returns:
+            The client's ConnectionInfo, if it had one
+        """
+        del self._connections[client_id]
 
-        return successful_sends
+        writer = self._writers.pop(client_id, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
+        # Mark frames that will never be sent as done so flush() doesn't hang
+        queue = self._send_queues.pop(client_id, None)
+        while queue is not None and not queue.empty():
+            queue.get_nowait()
+            queue.task_done()
+
+        return self._connection_info.pop(client_id, None)
 
     async def get_connection_count(self) -> int:
         """
@@ -183,6 +414,10 @@ class ConnectionManager:
         async with self._lock:
             return self._connection_info.get(client_id)
 
+    async def wait_for_no_connections(self) -> None:
+        """Wait until there are no active connections."""
+        await self._no_connections.wait()
+
     async def get_all_connection_info(self) -> dict[str, ConnectionInfo]:
         """
         Get connection information for all active clients.
@@ -243,8 +478,10 @@ class ConnectionManager:
                         logger.debug(f"Error closing WebSocket for {client_id}: {e}")
 
                     # Remove from tracking
-                    del self._connections[client_id]
-                    self._connection_info.pop(client_id, None)
+                    self._forget(client_id)
+
+            if not self._connections:
+                self._no_connections.set()
 
     async def ping_all_connections(self) -> int:
         """
@@ -258,7 +495,7 @@ class ConnectionManager:
 
         ping_message = {
             "type": "ping",
-            "timestamp": datetime.now(UTC).isoformat()
+            "timestamp": iso_now()
         }
 
         return await self.broadcast(ping_message)
@@ -275,11 +512,17 @@ class ConnectionManager:
         shutdown_message = {
             "type": "shutdown",
             "message": "Server is shutting down",
-            "timestamp": datetime.now(UTC).isoformat()
+            "timestamp": iso_now()
         }
 
         await self.broadcast(shutdown_message)
 
+        # Let the writers deliver the notice before the sockets are closed
+        try:
+            await asyncio.wait_for(self.flush(), timeout=SHUTDOWN_FLUSH_TIMEOUT)
+        except TimeoutError:
+            logger.warning("Timed out delivering shutdown notice to all clients")
+
         # Close all connections
         async with self._lock:
             client_ids = set(self._connections.keys())
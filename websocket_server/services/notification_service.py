@@ -5,7 +5,7 @@ from datetime import UTC, datetime
 
 from loguru import logger
 
-from ..config import settings
+from ..config import iso_now, settings
 from ..models import NotificationMessage
 from .connection_manager import ConnectionManager
 
@@ -25,14 +25,27 @@ class NotificationService:
         self._is_running = False
         self._notification_counter = 0
         self._start_time = datetime.now(UTC)
+        # Set once the periodic loop has sent its first notification
+        self._first_tick = asyncio.Event()
+
+    def is_running(self) -> bool:
+        """
+        Check if the periodic notification loop is running.
+
+        Returns:
+            True if periodic notifications are running, False otherwise
+        """
+        return self._is_running
 
     async def start_periodic_notifications(self) -> None:
-        """Start the periodic notification task."""
-        if self._is_running:
+        """Start the periodic notification task; a no-op if it is already running."""
+        # A task that is still winding down counts as running too
+        if self._is_running or (self._periodic_task and not self._periodic_task.done()):
             logger.warning("Periodic notifications already running")
             return
 
         self._is_running = True
+        self._first_tick.clear()
         self._periodic_task = asyncio.create_task(self._periodic_notification_loop())
 
         logger.info(
@@ -60,6 +73,10 @@ class NotificationService:
             extra={"total_notifications_sent": self._notification_counter}
         )
 
+    async def wait_for_first_notification(self) -> None:
+        """Wait until the periodic loop has sent its first notification."""
+        await self._first_tick.wait()
+
     async def send_notification(self, message: dict) -> int:
         """
         Send a notification message to all connected clients.
@@ -118,7 +135,7 @@ class NotificationService:
                 "counter": self._notification_counter,
                 "uptime_seconds": uptime.total_seconds(),
                 "active_connections": await self.connection_manager.get_connection_count(),
-                "server_time": datetime.now(UTC).isoformat()
+                "server_time": iso_now()
             },
             sender="notification_service"
         )
@@ -184,7 +201,7 @@ class NotificationService:
             data={
                 "message": message,
                 "priority": priority,
-                "system_time": datetime.now(UTC).isoformat()
+                "system_time": iso_now()
             },
             sender="system"
         )
@@ -220,6 +237,7 @@ class NotificationService:
             while self._is_running:
                 # Send test notification
                 recipients = await self.send_test_notification()
+                self._first_tick.set()
 
                 logger.debug(
                     f"Periodic notification sent to {recipients} clients",